@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Calendar, Meeting
+from .models import Calendar, Meeting, RecurrenceRule, RecurrenceException
 
 admin.site.register(Calendar)
-admin.site.register(Meeting)
\ No newline at end of file
+admin.site.register(Meeting)
+admin.site.register(RecurrenceRule)
+admin.site.register(RecurrenceException)
\ No newline at end of file
@@ -0,0 +1,100 @@
+''' iCalendar (RFC 5545) rendering for calendar feeds '''
+from datetime import timezone as dt_timezone
+from django.utils import timezone
+
+PRODID = "-//ClubCentric//Calendar Feed//EN"
+UID_DOMAIN = "clubcentric"
+
+
+def escape(text):
+    ''' Escape a TEXT property value '''
+    return (
+        (text or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+def fold(line):
+    ''' Split a content line into 75-octet chunks, continuation lines start with a space '''
+    chunk, size = "", 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > 75:
+            yield chunk + "\r\n"
+            chunk, size = " ", 1
+        chunk += char
+        size += width
+    yield chunk + "\r\n"
+
+def ics_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+def meeting_event(meeting, description):
+    yield "BEGIN:VEVENT"
+    yield f"UID:meeting-{meeting.id}@{UID_DOMAIN}"
+    yield f"DTSTAMP:{ics_datetime(timezone.now())}"
+    yield f"DTSTART:{ics_datetime(meeting.date)}"
+    yield f"SEQUENCE:{meeting.version}"
+    yield f"SUMMARY:{escape(description)}"
+    yield "END:VEVENT"
+
+def cancelled_event(deleted):
+    yield "BEGIN:VEVENT"
+    yield f"UID:meeting-{deleted.meeting_id}@{UID_DOMAIN}"
+    yield f"DTSTAMP:{ics_datetime(timezone.now())}"
+    yield f"DTSTART:{ics_datetime(deleted.date)}"
+    yield f"SEQUENCE:{deleted.version}"
+    yield "STATUS:CANCELLED"
+    yield "END:VEVENT"
+
+def rule_events(rule, description):
+    ''' The master event with an RRULE, plus one overriding event per moved occurrence '''
+    uid = f"rule-{rule.id}@{UID_DOMAIN}"
+    recur = f"FREQ={rule.frequency.upper()};INTERVAL={rule.interval}"
+    if rule.count:
+        recur += f";COUNT={rule.count}"
+    if rule.until:
+        recur += f";UNTIL={ics_datetime(rule.until)}"
+
+    exceptions = list(rule.exceptions.all())
+    yield "BEGIN:VEVENT"
+    yield f"UID:{uid}"
+    yield f"DTSTAMP:{ics_datetime(timezone.now())}"
+    yield f"DTSTART:{ics_datetime(rule.start)}"
+    yield f"RRULE:{recur}"
+    for exc in exceptions:
+        if exc.cancelled:
+            yield f"EXDATE:{ics_datetime(exc.original_date)}"
+    yield f"SUMMARY:{escape(description(rule.description))}"
+    yield "END:VEVENT"
+
+    for exc in exceptions:
+        if exc.cancelled:
+            continue
+        yield "BEGIN:VEVENT"
+        yield f"UID:{uid}"
+        yield f"DTSTAMP:{ics_datetime(timezone.now())}"
+        yield f"RECURRENCE-ID:{ics_datetime(exc.original_date)}"
+        yield f"DTSTART:{ics_datetime(exc.date)}"
+        summary = exc.description if exc.description is not None else rule.description
+        yield f"SUMMARY:{escape(description(summary))}"
+        yield "END:VEVENT"
+
+def render(name, events):
+    ''' Stream a VCALENDAR wrapping the given event line iterables '''
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escape(name)}",
+    ]
+    for line in header:
+        yield from fold(line)
+    for event in events:
+        for line in event:
+            yield from fold(line)
+    yield from fold("END:VCALENDAR")
@@ -0,0 +1,141 @@
+''' Streaming meeting import from CSV or iCalendar sources '''
+import csv
+import re
+from datetime import datetime, time
+from itertools import islice
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+from .models import Calendar, Meeting
+
+CHUNK_SIZE = 500
+
+
+def parse_csv(lines):
+    '''
+    Yield (date, description) from CSV lines with a header row naming a
+    datetime (or date) column and a description column. Bad rows yield (None, None).
+    '''
+    for row in csv.DictReader(lines):
+        raw = (row.get("datetime") or row.get("date") or "").strip()
+        description = (row.get("description") or "").strip()
+        try:
+            date = parse_datetime(raw)
+            if date is None and parse_date(raw):
+                date = datetime.combine(parse_date(raw), time.min)
+        except ValueError:
+            date = None
+        if date is None or not description:
+            yield None, None
+            continue
+        if timezone.is_naive(date):
+            date = timezone.make_aware(date)
+        yield date, description
+
+def parse_ics_datetime(value, params):
+    ''' DTSTART value in UTC (…Z), floating or TZID form, or a VALUE=DATE day '''
+    tzinfo = timezone.get_current_timezone()
+    if "TZID" in params:
+        try:
+            tzinfo = ZoneInfo(params["TZID"])
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=ZoneInfo("UTC"))
+    if "T" in value:
+        return datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=tzinfo)
+    return datetime.strptime(value, "%Y%m%d").replace(tzinfo=tzinfo)
+
+def unescape(text):
+    ''' Undo RFC 5545 TEXT escaping '''
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) in "nN" else m.group(1), text)
+
+def unfolded(lines):
+    ''' Join RFC 5545 continuation lines, one logical line at a time '''
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+def parse_ics(lines):
+    '''
+    Yield (date, description) for each VEVENT. Recurring events and events
+    without a usable DTSTART yield (None, None).
+    '''
+    event = None
+    for line in unfolded(lines):
+        if line == "BEGIN:VEVENT":
+            event = {}
+            continue
+        if event is None:
+            continue
+        if line == "END:VEVENT":
+            try:
+                date = parse_ics_datetime(*event["DTSTART"])
+            except (KeyError, ValueError):
+                date = None
+            description = event.get("SUMMARY") or event.get("DESCRIPTION")
+            if date is None or not description or "RRULE" in event:
+                yield None, None
+            else:
+                yield date, description
+            event = None
+            continue
+
+        name, _, value = line.partition(":")
+        name, *raw_params = name.split(";")
+        params = dict(p.split("=", 1) for p in raw_params if "=" in p)
+        if name == "DTSTART":
+            event[name] = (value, params)
+        elif name in ("SUMMARY", "DESCRIPTION"):
+            event[name] = unescape(value)
+        elif name == "RRULE":
+            event[name] = value
+
+def import_meetings(calendar, rows, chunk_size=CHUNK_SIZE):
+    '''
+    Insert (date, description) rows into calendar in chunks, skipping any
+    slot the calendar already has. Each chunk is one existence query, one
+    bulk insert and one version bump. Returns counts of created, duplicate
+    and invalid rows.
+    '''
+    counts = {"created": 0, "duplicates": 0, "invalid": 0}
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return counts
+
+        batch = {}
+        for date, description in chunk:
+            if date is None:
+                counts["invalid"] += 1
+            elif date in batch:
+                counts["duplicates"] += 1
+            else:
+                batch[date] = description
+
+        with transaction.atomic():
+            taken = set(Meeting.objects.filter(calendar=calendar, date__in=list(batch)).values_list("date", flat=True))
+            new_meetings = [
+                Meeting(calendar=calendar, date=date, description=description)
+                for date, description in batch.items()
+                if date not in taken
+            ]
+            if new_meetings:
+                # bulk_create skips the pre_save signal, so stamp the batch here
+                version = Calendar.bump_version(calendar.id)
+                for meet in new_meetings:
+                    meet.version = version
+                Meeting.objects.bulk_create(new_meetings, ignore_conflicts=True)
+
+        counts["duplicates"] += len(batch) - len(new_meetings)
+        counts["created"] += len(new_meetings)
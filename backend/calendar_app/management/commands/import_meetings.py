@@ -0,0 +1,49 @@
+"""
+Django management command to import meetings into a calendar from a CSV or ICS file
+Usage: python manage.py import_meetings <calendar_id> <path> [--format csv|ics]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from calendar_app.models import Calendar
+from calendar_app.importers import parse_csv, parse_ics, import_meetings, CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Import meetings into a calendar from a CSV (datetime,description) or ICS file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('calendar_id', type=int)
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ics'],
+            help='File format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help=f'Meetings inserted per batch (default: {CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            calendar = Calendar.objects.get(id=options['calendar_id'])
+        except Calendar.DoesNotExist:
+            raise CommandError('Calendar not found')
+
+        if calendar.is_club_mirror:
+            raise CommandError('Cannot import meetings into a mirror calendar')
+
+        path = options['path']
+        file_format = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if file_format not in ('csv', 'ics'):
+            raise CommandError('Could not tell the file format; pass --format csv or --format ics')
+
+        parser = parse_csv if file_format == 'csv' else parse_ics
+        with open(path, newline='', encoding='utf-8-sig') as source:
+            counts = import_meetings(calendar, parser(source), chunk_size=options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counts['created']} meetings into '{calendar.name}' "
+            f"({counts['duplicates']} duplicates, {counts['invalid']} invalid rows skipped)"
+        ))
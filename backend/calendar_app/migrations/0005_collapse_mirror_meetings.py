@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:29
+
+from django.db import migrations
+
+
+def delete_mirror_meetings(apps, schema_editor):
+    ''' Mirror calendars now read club meetings through Membership, so the
+    per-member copies are redundant '''
+    Meeting = apps.get_model('calendar_app', 'Meeting')
+    Meeting.objects.filter(is_mirror=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0004_calendar_is_club_mirror_calendar_source_club_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_mirror_meetings, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='meeting',
+            name='is_mirror',
+        ),
+        migrations.RemoveField(
+            model_name='meeting',
+            name='source_meeting',
+        ),
+    ]
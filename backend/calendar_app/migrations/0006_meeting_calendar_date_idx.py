@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0005_collapse_mirror_meetings'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['calendar', 'date'], name='meeting_calendar_date_idx'),
+        ),
+    ]
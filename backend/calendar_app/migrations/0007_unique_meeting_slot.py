@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:32
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def delete_duplicate_meetings(apps, schema_editor):
+    ''' Keep the oldest meeting in each (calendar, date) slot '''
+    Meeting = apps.get_model('calendar_app', 'Meeting')
+    keep = (
+        Meeting.objects.values('calendar_id', 'date')
+        .annotate(keep_id=Min('id'))
+        .values('keep_id')
+    )
+    duplicates = Meeting.objects.exclude(id__in=keep)
+    duplicates.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0006_meeting_calendar_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_meetings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='meeting',
+            constraint=models.UniqueConstraint(fields=('calendar', 'date'), name='unique_meeting_slot'),
+        ),
+        migrations.RemoveIndex(
+            model_name='meeting',
+            name='meeting_calendar_date_idx',
+        ),
+    ]
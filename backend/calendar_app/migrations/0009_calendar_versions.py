@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0008_recurrence_rules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedMeeting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('meeting_id', models.BigIntegerField()),
+                ('date', models.DateTimeField()),
+                ('version', models.PositiveBigIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='calendar',
+            name='rules_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='calendar',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['calendar', 'version'], name='meeting_calendar_version_idx'),
+        ),
+        migrations.AddField(
+            model_name='deletedmeeting',
+            name='calendar',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deleted_meetings', to='calendar_app.calendar'),
+        ),
+        migrations.AddIndex(
+            model_name='deletedmeeting',
+            index=models.Index(fields=['calendar', 'version'], name='deleted_calendar_version_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 14:30
+
+import calendar_app.models
+from django.db import migrations, models
+
+
+def issue_feed_tokens(apps, schema_editor):
+    ''' Give every existing calendar its own feed token '''
+    Calendar = apps.get_model('calendar_app', 'Calendar')
+    calendars = list(Calendar.objects.only('id'))
+    for calendar in calendars:
+        calendar.feed_token = calendar_app.models.new_feed_token()
+    Calendar.objects.bulk_update(calendars, ['feed_token'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0009_calendar_versions'),
+    ]
+
+    operations = [
+        # Added nullable first: a column default would give every row the same token
+        migrations.AddField(
+            model_name='calendar',
+            name='feed_token',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(issue_feed_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='calendar',
+            name='feed_token',
+            field=models.CharField(default=calendar_app.models.new_feed_token, editable=False, max_length=64, unique=True),
+        ),
+    ]
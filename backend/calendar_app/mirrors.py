@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models import F
+from clubs.models import Membership
+from .models import Calendar
+
+
+def sync_mirror_calendars(club, user_ids=None):
+    ''' Reconcile a club's mirror calendars with its memberships using set-based
+    statements in one transaction. Limit the sync to some users with user_ids.
+    Returns the number of rows created, renamed and deleted '''
+    name = club.name[:Calendar._meta.get_field("name").max_length]
+
+    members = Membership.objects.filter(club=club)
+    mirrors = Calendar.objects.filter(is_club_mirror=True, source_club=club)
+    if user_ids is not None:
+        members = members.filter(user_id__in=user_ids)
+        mirrors = mirrors.filter(user_id__in=user_ids)
+
+    with transaction.atomic():
+        # Mirrors whose owner is no longer a member
+        deleted, _ = mirrors.exclude(
+            user_id__in=members.values("user_id")
+        ).delete()
+
+        # Keep mirror names in step with the club
+        renamed = mirrors.exclude(name=name).update(name=name, version=F("version") + 1)
+
+        # Members without a mirror yet
+        missing = members.exclude(
+            user_id__in=mirrors.values("user_id")
+        ).values_list("user_id", flat=True)
+        created = Calendar.objects.bulk_create([
+            Calendar(name=name, user_id=user_id, is_club_mirror=True, source_club=club)
+            for user_id in missing
+        ])
+
+    return {"created": len(created), "renamed": renamed, "deleted": deleted}
@@ -1,7 +1,14 @@
-from django.db import models
+from django.db import models, transaction
 from clubs.models import Club
 from users.models import User
 from django.core.exceptions import ValidationError
+from calendar import monthrange
+from datetime import timedelta
+import heapq
+import secrets
+
+def new_feed_token():
+    return secrets.token_urlsafe(24)
 
 class Calendar(models.Model):
     name = models.CharField(max_length=50)
@@ -30,6 +37,14 @@ class Calendar(models.Model):
         related_name="mirror_calendars"
     )
 
+    # Change counters for feed ETags and sync tokens. version moves on every
+    # change to the calendar; rules_version records the last recurrence change
+    version = models.PositiveBigIntegerField(default=0)
+    rules_version = models.PositiveBigIntegerField(default=0)
+
+    # Secret in the feed URL; calendar apps subscribing to it have no session
+    feed_token = models.CharField(max_length=64, unique=True, default=new_feed_token, editable=False)
+
     def clean(self):
         if not (self.user or self.club):
             raise ValidationError("Calendar must belong to a user or a club")
@@ -39,18 +54,170 @@ class Calendar(models.Model):
         # Mirror calendars must have user and source_club
         if self.is_club_mirror and not (self.user and self.source_club):
             raise ValidationError("Mirror calendar must have both user and source_club")
-    
+
+    @staticmethod
+    def bump_version(calendar_id, rules=False):
+        '''
+        Increment a calendar's change counter and return the new value. The
+        update locks the calendar row until the caller's transaction ends, so
+        the read sees this increment and no other writer can slip in between
+        '''
+        changes = {"version": models.F("version") + 1}
+        if rules:
+            changes["rules_version"] = models.F("version") + 1
+        with transaction.atomic():
+            Calendar.objects.filter(pk=calendar_id).update(**changes)
+            return Calendar.objects.values_list("version", flat=True).get(pk=calendar_id)
+
+    def feed_sources(self):
+        ''' Calendars whose rows make up this calendar's feed '''
+        if self.is_club_mirror:
+            return Calendar.objects.filter(
+                club=self.source_club,
+                club__member_club__user=self.user,
+            ).order_by("id")
+        return Calendar.objects.filter(pk=self.pk)
+
+    def resolve_meetings(self):
+        ''' Meetings shown on this calendar. Mirror calendars hold no rows of their
+        own; they read through the owner's membership to the source club calendars '''
+        if self.is_club_mirror:
+            return Meeting.objects.filter(
+                calendar__club=self.source_club,
+                calendar__club__member_club__user=self.user,
+            ).select_related("calendar")
+        return self.meetings.all()
+
+    def resolve_rules(self):
+        ''' Recurrence rules shown on this calendar, resolved like resolve_meetings '''
+        if self.is_club_mirror:
+            return RecurrenceRule.objects.filter(
+                calendar__club=self.source_club,
+                calendar__club__member_club__user=self.user,
+            ).select_related("calendar")
+        return self.recurrence_rules.all()
+
 class Meeting(models.Model):
     calendar = models.ForeignKey(Calendar, on_delete=models.CASCADE, related_name="meetings")
     date = models.DateTimeField()
     description = models.TextField(null=True)
+    # Calendar.version at the meeting's last write
+    version = models.PositiveBigIntegerField(default=0)
 
-    # Mirror meeting fields
-    is_mirror = models.BooleanField(default=False)
-    source_meeting = models.ForeignKey(
-        'self',
-        null=True,
-        blank=True,
-        on_delete=models.CASCADE,
-        related_name="mirror_meetings"
-    )
+    class Meta:
+        constraints = [
+            # One meeting per slot; its index also serves date-range scans of a calendar
+            models.UniqueConstraint(fields=["calendar", "date"], name="unique_meeting_slot"),
+        ]
+        indexes = [
+            models.Index(fields=["calendar", "version"], name="meeting_calendar_version_idx"),
+        ]
+
+
+class DeletedMeeting(models.Model):
+    ''' Tombstone so sync-token clients learn about removed meetings '''
+    calendar = models.ForeignKey(Calendar, on_delete=models.CASCADE, related_name="deleted_meetings")
+    meeting_id = models.BigIntegerField()
+    date = models.DateTimeField()
+    version = models.PositiveBigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["calendar", "version"], name="deleted_calendar_version_idx"),
+        ]
+
+
+
+class RecurrenceRule(models.Model):
+    ''' A repeating meeting stored as one row and expanded on demand '''
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+    calendar = models.ForeignKey(Calendar, on_delete=models.CASCADE, related_name="recurrence_rules")
+    description = models.TextField(null=True)
+    # First occurrence; later ones keep its time of day
+    start = models.DateTimeField()
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveIntegerField(default=1)
+    # Optional end: last allowed date and/or total number of occurrences
+    until = models.DateTimeField(null=True, blank=True)
+    count = models.PositiveIntegerField(null=True, blank=True)
+
+    def clean(self):
+        if self.interval < 1:
+            raise ValidationError("interval must be at least 1")
+        if self.until and self.until < self.start:
+            raise ValidationError("until must not be before start")
+
+    def nth(self, n):
+        ''' Date of the n-th occurrence, counting from 0 '''
+        if self.frequency == 'monthly':
+            months = self.start.month - 1 + n * self.interval
+            year = self.start.year + months // 12
+            month = months % 12 + 1
+            # Clamp e.g. the 31st to the last day of shorter months
+            day = min(self.start.day, monthrange(year, month)[1])
+            return self.start.replace(year=year, month=month, day=day)
+        days = 7 if self.frequency == 'weekly' else 1
+        return self.start + timedelta(days=days * self.interval * n)
+
+    def first_index(self, start):
+        ''' Index of an occurrence at or just before start, so expansion can skip ahead '''
+        if start <= self.start:
+            return 0
+        if self.frequency == 'monthly':
+            months = (start.year - self.start.year) * 12 + start.month - self.start.month
+            return max(0, months // self.interval - 1)
+        days = 7 if self.frequency == 'weekly' else 1
+        step = timedelta(days=days * self.interval)
+        return max(0, (start - self.start) // step - 1)
+
+    def base_occurrences(self, start, end):
+        ''' Lazily yield the rule's dates in [start, end), ignoring exceptions '''
+        n = self.first_index(start)
+        while self.count is None or n < self.count:
+            date = self.nth(n)
+            if date >= end or (self.until and date > self.until):
+                return
+            if date >= start:
+                yield date
+            n += 1
+
+    def is_occurrence(self, date):
+        return next(self.base_occurrences(date, date + timedelta(microseconds=1)), None) == date
+
+    def occurrences(self, start, end):
+        ''' Lazily yield (date, description) for [start, end) in date order,
+        applying cancelled and moved occurrences '''
+        exceptions = {exc.original_date: exc for exc in self.exceptions.all()}
+
+        def regular():
+            for date in self.base_occurrences(start, end):
+                if date not in exceptions:
+                    yield (date, self.description)
+
+        moved = sorted(
+            (exc.date, exc.description if exc.description is not None else self.description)
+            for exc in exceptions.values()
+            if not exc.cancelled and exc.date is not None and start <= exc.date < end
+        )
+        return heapq.merge(regular(), moved, key=lambda occurrence: occurrence[0])
+
+
+class RecurrenceException(models.Model):
+    ''' Cancels or moves a single occurrence of a RecurrenceRule '''
+    rule = models.ForeignKey(RecurrenceRule, on_delete=models.CASCADE, related_name="exceptions")
+    original_date = models.DateTimeField()
+    cancelled = models.BooleanField(default=False)
+    # Replacement values for a moved/edited occurrence
+    date = models.DateTimeField(null=True, blank=True)
+    description = models.TextField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('rule', 'original_date')
+
+    def clean(self):
+        if not self.cancelled and self.date is None:
+            raise ValidationError("A moved occurrence needs a date")
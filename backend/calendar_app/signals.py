@@ -1,95 +1,63 @@
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import Meeting, Calendar
-from clubs.models import Membership
+from .models import Calendar, Meeting, DeletedMeeting, RecurrenceRule, RecurrenceException
 
 
-@receiver(post_save, sender=Meeting)
-def sync_meeting_to_mirrors(sender, instance, created, **kwargs):
-    """
-    When a club meeting is created or updated, sync it to all member mirror calendars.
-    """
-    # Skip if this is already a mirror meeting
-    if instance.is_mirror:
-        return
-
-    # Check if meeting is in a club calendar
-    if not instance.calendar.club:
-        return
-
-    club = instance.calendar.club
-    calendar_name = instance.calendar.name
-
-    # Find all mirror calendars for this club
-    mirror_calendars = Calendar.objects.filter(
-        is_club_mirror=True,
-        source_club=club
-    )
+def deleted_directly(sender, origin):
+    '''
+    True when the delete started from this model rather than cascading from a
+    calendar, club or user that is going away with it.
+    '''
+    if isinstance(origin, QuerySet):
+        return origin.model is sender
+    return isinstance(origin, sender)
 
-    # Prepare description with original calendar name
-    original_description = instance.description or ""
-    mirror_description = f"[{calendar_name}] {original_description}"
 
-    for mirror_calendar in mirror_calendars:
-        if created:
-            # Create new mirror meeting
-            Meeting.objects.create(
-                calendar=mirror_calendar,
-                date=instance.date,
-                description=mirror_description,
-                is_mirror=True,
-                source_meeting=instance
-            )
-        else:
-            # Update existing mirror meeting
-            mirror_meetings = Meeting.objects.filter(
-                source_meeting=instance,
-                calendar=mirror_calendar
-            )
-            for mirror_meeting in mirror_meetings:
-                mirror_meeting.date = instance.date
-                mirror_meeting.description = mirror_description
-                mirror_meeting.save()
+@receiver(pre_save, sender=Meeting)
+def stamp_meeting_version(sender, instance, **kwargs):
+    """
+    Bump the calendar's change counter and record it on the meeting, so feeds
+    get a new ETag and sync-token clients pick the meeting up. Save meetings
+    inside transaction.atomic(): otherwise the new version is committed before
+    the row carrying it, and a feed polled in between hands out a sync token
+    that skips the change.
+    """
+    instance.version = Calendar.bump_version(instance.calendar_id)
 
 
 @receiver(post_delete, sender=Meeting)
-def delete_mirror_meetings(sender, instance, **kwargs):
+def record_deleted_meeting(sender, instance, origin=None, **kwargs):
     """
-    When a club meeting is deleted, delete all its mirror copies.
+    Leave a tombstone for sync-token clients when a meeting is deleted.
     """
-    # Skip if this is already a mirror meeting
-    if instance.is_mirror:
+    if not deleted_directly(sender, origin):
         return
 
-    # Delete all mirror meetings that reference this source meeting
-    Meeting.objects.filter(source_meeting=instance).delete()
+    DeletedMeeting.objects.create(
+        calendar_id=instance.calendar_id,
+        meeting_id=instance.id,
+        date=instance.date,
+        version=Calendar.bump_version(instance.calendar_id)
+    )
 
 
-@receiver(pre_save, sender=Meeting)
-def prevent_mirror_edit(sender, instance, **kwargs):
+@receiver(post_save, sender=RecurrenceRule)
+@receiver(post_delete, sender=RecurrenceRule)
+def rule_changed(sender, instance, origin=None, **kwargs):
     """
-    Prevent direct editing of mirror meetings.
-    Mirror meetings should only be updated via their source meeting.
+    Recurrence changes are not tracked per row; they move rules_version so
+    older sync tokens fall back to a full feed.
     """
-    # Skip for new meetings
-    if not instance.pk:
+    if origin is not None and not deleted_directly(sender, origin):
         return
+    Calendar.bump_version(instance.calendar_id, rules=True)
 
-    # Skip if not a mirror
-    if not instance.is_mirror:
-        return
 
-    # Get original values from database
-    try:
-        original = Meeting.objects.get(pk=instance.pk)
-    except Meeting.DoesNotExist:
+@receiver(post_save, sender=RecurrenceException)
+@receiver(post_delete, sender=RecurrenceException)
+def rule_exception_changed(sender, instance, origin=None, **kwargs):
+    if origin is not None and not deleted_directly(sender, origin):
         return
-
-    # Check if any field changed (except through signal sync)
-    if (original.date != instance.date or
-        original.description != instance.description or
-        original.calendar_id != instance.calendar_id):
-        # This edit is coming from user, not from signal
-        # The signal will update these fields, so we allow it
-        # But we should prevent manual updates through views (handled in views.py)
-        pass
+    calendar_id = RecurrenceRule.objects.values_list("calendar_id", flat=True).get(pk=instance.rule_id)
+    Calendar.bump_version(calendar_id, rules=True)
@@ -2,8 +2,17 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from django.db import connection
+from django.core.cache import cache
+from django.test.utils import CaptureQueriesContext
+from django.core.files.uploadedfile import SimpleUploadedFile
+from datetime import timedelta
+import json
 from clubs.models import Club, Membership
-from .models import Calendar, Meeting
+from users.permissions import club_roles
+from .models import Calendar, Meeting, RecurrenceRule
+from .mirrors import sync_mirror_calendars
+from .importers import import_meetings
 
 User = get_user_model()
 
@@ -84,6 +93,50 @@ class MeetingViewsTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTrue(Meeting.objects.filter(calendar=self.cal).exists())
 
+    def test_create_meeting_same_slot(self):
+        """A second meeting at the same time is rejected"""
+        when = timezone.now().isoformat()
+        self.client.post(reverse("meeting-create"), {"calendar_id": self.cal.id, "datetime_str": when, "description": "A"})
+        response = self.client.post(reverse("meeting-create"), {"calendar_id": self.cal.id, "datetime_str": when, "description": "B"})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Meeting.objects.filter(calendar=self.cal).count(), 1)
+
+    def test_bulk_create_meetings(self):
+        """A batch of meetings is inserted together"""
+        response = self.client.post(reverse("meeting-bulk-create"), {
+            "calendar_id": self.cal.id,
+            "meetings": json.dumps([
+                {"datetime_str": "2025-03-01T10:00:00Z", "description": "One"},
+                {"datetime_str": "2025-03-08T10:00:00Z", "description": "Two"},
+            ])
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["meet_ids"]), 2)
+        self.assertEqual(Meeting.objects.filter(calendar=self.cal).count(), 2)
+
+    def test_bulk_create_meetings_conflict(self):
+        """A batch touching a taken slot inserts nothing"""
+        Meeting.objects.create(calendar=self.cal, date="2025-03-08T10:00:00Z", description="Taken")
+        response = self.client.post(reverse("meeting-bulk-create"), {
+            "calendar_id": self.cal.id,
+            "meetings": json.dumps([
+                {"datetime_str": "2025-03-01T10:00:00Z", "description": "One"},
+                {"datetime_str": "2025-03-08T10:00:00Z", "description": "Two"},
+            ])
+        })
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["conflicts"], ["2025-03-08T10:00:00+00:00"])
+        self.assertEqual(Meeting.objects.filter(calendar=self.cal).count(), 1)
+
+    def test_bulk_create_meetings_impossible_date(self):
+        """A well-formed but impossible date is rejected, not a server error"""
+        response = self.client.post(reverse("meeting-bulk-create"), {
+            "calendar_id": self.cal.id,
+            "meetings": json.dumps([{"datetime_str": "2025-13-40T10:00", "description": "One"}])
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Meeting.objects.filter(calendar=self.cal).exists())
+
     def test_get_meetings_list(self):
         """List all meetings for a calendar"""
         Meeting.objects.create(calendar=self.cal, date=timezone.now(), description="Discuss plan")
@@ -107,3 +160,411 @@ class MeetingViewsTest(TestCase):
         response = self.client.post(reverse("meeting-delete"), {"meet_id": meet.id})
         self.assertEqual(response.status_code, 200)
         self.assertFalse(Meeting.objects.filter(id=meet.id).exists())
+
+    def test_meetings_list_window(self):
+        """start/end restrict the list to a date window, ordered by date"""
+        for day in (20, 3, 10, 1):
+            Meeting.objects.create(calendar=self.cal, date=f"2025-03-{day:02d}T12:00:00Z", description=f"Day {day}")
+        Meeting.objects.create(calendar=self.cal, date="2025-04-02T12:00:00Z", description="April")
+        response = self.client.get(reverse("meeting-list"), {
+            "calendar_id": self.cal.id,
+            "start": "2025-03-01",
+            "end": "2025-04-01",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([m["description"] for m in response.json()], ["Day 1", "Day 3", "Day 10", "Day 20"])
+
+    def test_meetings_list_keyset_page(self):
+        """after/after_id continue from the last meeting of the previous page"""
+        for day in range(1, 6):
+            Meeting.objects.create(calendar=self.cal, date=f"2025-03-{day:02d}T12:00:00Z", description=f"Day {day}")
+        first = self.client.get(reverse("meeting-list"), {"calendar_id": self.cal.id, "limit": 2}).json()
+        self.assertEqual([m["description"] for m in first], ["Day 1", "Day 2"])
+        second = self.client.get(reverse("meeting-list"), {
+            "calendar_id": self.cal.id,
+            "limit": 2,
+            "after": first[-1]["date"],
+            "after_id": first[-1]["id"],
+        }).json()
+        self.assertEqual([m["description"] for m in second], ["Day 3", "Day 4"])
+
+    def test_meetings_list_bad_window(self):
+        """Malformed window params are rejected"""
+        response = self.client.get(reverse("meeting-list"), {"calendar_id": self.cal.id, "start": "soon"})
+        self.assertEqual(response.status_code, 400)
+
+
+class MirrorCalendarTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.organizer = User.objects.create_user(username="olive", password="testpass")
+        self.member = User.objects.create_user(username="mia", password="testpass")
+        self.club = Club.objects.create(name="Chess Club", description="Chess fans unite")
+        Membership.objects.create(user=self.organizer, club=self.club, role="organizer")
+        self.club_cal = Calendar.objects.create(name="Events", club=self.club)
+        Meeting.objects.create(calendar=self.club_cal, date=timezone.now(), description="Kickoff")
+
+        self.client.login(username="mia", password="testpass")
+        self.client.post(reverse("create-membership"), {"club_id": self.club.id})
+        self.mirror = Calendar.objects.get(user=self.member, is_club_mirror=True, source_club=self.club)
+
+    def test_join_does_not_copy_meetings(self):
+        """Joining a club creates the mirror calendar but no meeting rows"""
+        self.assertFalse(self.mirror.meetings.exists())
+        self.assertEqual(Meeting.objects.count(), 1)
+
+    def test_mirror_lists_club_meetings(self):
+        """Mirror calendar resolves club meetings at read time"""
+        Meeting.objects.create(calendar=self.club_cal, date=timezone.now(), description="Blitz night")
+        response = self.client.get(reverse("meeting-list"), {"calendar_id": self.mirror.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("[Events] Kickoff", str(response.content))
+        self.assertIn("[Events] Blitz night", str(response.content))
+
+    def test_mirror_empty_after_leaving(self):
+        """A stale mirror calendar shows nothing once the membership is gone"""
+        Membership.objects.filter(user=self.member, club=self.club).delete()
+        self.assertFalse(self.mirror.resolve_meetings().exists())
+
+    def test_mirror_requires_owner(self):
+        """Only the owner can read a mirror calendar"""
+        self.client.login(username="olive", password="testpass")
+        response = self.client.get(reverse("meeting-list"), {"calendar_id": self.mirror.id})
+        self.assertEqual(response.status_code, 403)
+
+
+class MirrorSyncTest(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Go Club", description="Stones")
+        self.users = [User.objects.create_user(username=f"u{i}", password="testpass") for i in range(3)]
+        for user in self.users:
+            Membership.objects.create(user=user, club=self.club, role="member")
+
+    def test_sync_creates_missing_mirrors(self):
+        """Every member gets exactly one mirror calendar"""
+        counts = sync_mirror_calendars(self.club)
+        self.assertEqual(counts, {"created": 3, "renamed": 0, "deleted": 0})
+        self.assertEqual(sync_mirror_calendars(self.club)["created"], 0)
+        self.assertEqual(Calendar.objects.filter(source_club=self.club, is_club_mirror=True).count(), 3)
+
+    def test_sync_renames_and_removes(self):
+        """Mirrors follow the club name and disappear when the member leaves"""
+        sync_mirror_calendars(self.club)
+        self.club.name = "Baduk Club"
+        Membership.objects.filter(user=self.users[0]).delete()
+
+        counts = sync_mirror_calendars(self.club)
+        self.assertEqual(counts, {"created": 0, "renamed": 2, "deleted": 1})
+        self.assertFalse(Calendar.objects.filter(user=self.users[0], is_club_mirror=True).exists())
+        self.assertEqual(Calendar.objects.get(user=self.users[1], is_club_mirror=True).name, "Baduk Club")
+
+    def test_sync_limited_to_users(self):
+        """user_ids restricts the sync to those members"""
+        counts = sync_mirror_calendars(self.club, user_ids=[self.users[1].id])
+        self.assertEqual(counts["created"], 1)
+        self.assertTrue(Calendar.objects.filter(user=self.users[1], is_club_mirror=True).exists())
+
+
+class MeetingWriteCostTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.organizer = User.objects.create_user(username="org", password="testpass")
+        self.client.login(username="org", password="testpass")
+        cache.clear()
+
+    def make_club(self, name, members):
+        club = Club.objects.create(name=name, description="")
+        Membership.objects.create(user=self.organizer, club=club, role="organizer")
+        for i in range(members):
+            user = User.objects.create_user(username=f"{name}{i}", password="testpass")
+            Membership.objects.create(user=user, club=club, role="member")
+        sync_mirror_calendars(club)
+        calendar = Calendar.objects.create(name="Events", club=club)
+        return Meeting.objects.create(calendar=calendar, date=timezone.now(), description="Old")
+
+    def count_update_queries(self, meeting):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse("meeting-update"), {"meet_id": meeting.id, "desc": "New"})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_update_cost_independent_of_club_size(self):
+        """Editing a club meeting does not fan out to members' mirrors"""
+        small = self.make_club("small", 1)
+        large = self.make_club("large", 25)
+        # Warm the organizer's cached club roles so neither request pays the load
+        club_roles(self.organizer)
+        self.assertEqual(self.count_update_queries(small), self.count_update_queries(large))
+
+
+class AgendaTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="ana", password="testpass")
+        self.club = Club.objects.create(name="Chess Club", description="")
+        self.other_club = Club.objects.create(name="Go Club", description="")
+        Membership.objects.create(user=self.user, club=self.club, role="member")
+        sync_mirror_calendars(self.club)
+
+        personal = Calendar.objects.create(name="Mine", user=self.user)
+        club_cal = Calendar.objects.create(name="Events", club=self.club)
+        other_cal = Calendar.objects.create(name="Other", club=self.other_club)
+        Meeting.objects.create(calendar=personal, date="2025-03-05T09:00:00Z", description="Dentist")
+        Meeting.objects.create(calendar=club_cal, date="2025-03-02T18:00:00Z", description="Blitz")
+        Meeting.objects.create(calendar=club_cal, date="2025-05-02T18:00:00Z", description="Later")
+        Meeting.objects.create(calendar=other_cal, date="2025-03-03T18:00:00Z", description="Not mine")
+        self.client.login(username="ana", password="testpass")
+
+    def test_agenda_merges_calendars(self):
+        """Personal and club meetings come back in one date-ordered list"""
+        response = self.client.get(reverse("agenda"), {"start": "2025-03-01", "end": "2025-04-01"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([m["description"] for m in response.json()], ["Blitz", "Dentist"])
+        self.assertEqual(response.json()[0]["club_id"], self.club.id)
+
+    def test_agenda_requires_window(self):
+        """start and end are required"""
+        response = self.client.get(reverse("agenda"), {"start": "2025-03-01"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_agenda_includes_recurring_meetings(self):
+        """Recurring occurrences are merged into the same date-ordered, keyset-paged stream"""
+        club_cal = Calendar.objects.get(name="Events")
+        RecurrenceRule.objects.create(
+            calendar=club_cal, start="2025-03-02T18:00:00Z", frequency="weekly", description="Practice"
+        )
+        window = {"start": "2025-03-01", "end": "2025-03-10"}
+
+        items = self.client.get(reverse("agenda"), window).json()
+        self.assertEqual(
+            [(m["date"], m["description"]) for m in items],
+            [
+                ("2025-03-02T18:00:00+00:00", "Blitz"),
+                ("2025-03-02T18:00:00+00:00", "Practice"),
+                ("2025-03-05T09:00:00+00:00", "Dentist"),
+                ("2025-03-09T18:00:00+00:00", "Practice"),
+            ],
+        )
+
+        # Page through two at a time, continuing from an occurrence
+        first = self.client.get(reverse("agenda"), {**window, "limit": 2}).json()
+        last = first[-1]
+        second = self.client.get(reverse("agenda"), {
+            **window, "limit": 2, "after": last["date"], "after_rule_id": last["rule_id"]
+        }).json()
+        self.assertEqual([m["description"] for m in first + second], [m["description"] for m in items])
+
+
+class RecurringMeetingTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="rita", password="testpass")
+        self.client.login(username="rita", password="testpass")
+        self.cal = Calendar.objects.create(name="Mine", user=self.user)
+
+    def create_weekly(self, **extra):
+        response = self.client.post(reverse("recurring-create"), {
+            "calendar_id": self.cal.id,
+            "datetime_str": "2025-01-06T18:00:00Z",
+            "description": "Practice",
+            "frequency": "weekly",
+            **extra,
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()["rule_id"]
+
+    def list_occurrences(self, start, end):
+        response = self.client.get(reverse("recurring-occurrences"), {
+            "calendar_id": self.cal.id, "start": start, "end": end
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_rule_is_one_row(self):
+        """A semester of weekly meetings is stored as a single rule"""
+        self.create_weekly(until="2025-05-01T00:00:00Z")
+        self.assertEqual(RecurrenceRule.objects.count(), 1)
+        self.assertEqual(Meeting.objects.count(), 0)
+
+    def test_occurrences_in_window(self):
+        """Only occurrences inside the requested window are expanded"""
+        self.create_weekly()
+        dates = [o["date"] for o in self.list_occurrences("2025-03-01", "2025-03-18")]
+        self.assertEqual(dates, [
+            "2025-03-03T18:00:00+00:00",
+            "2025-03-10T18:00:00+00:00",
+            "2025-03-17T18:00:00+00:00",
+        ])
+
+    def test_count_limits_occurrences(self):
+        """count stops the rule after that many meetings"""
+        self.create_weekly(count=2)
+        self.assertEqual(len(self.list_occurrences("2025-01-01", "2025-12-31")), 2)
+
+    def test_cancel_and_move_occurrence(self):
+        """Exceptions cancel or move single occurrences"""
+        rule_id = self.create_weekly(count=3)
+        self.client.post(reverse("recurring-occurrence"), {
+            "rule_id": rule_id, "occurrence_str": "2025-01-13T18:00:00Z"
+        })
+        self.client.post(reverse("recurring-occurrence"), {
+            "rule_id": rule_id,
+            "occurrence_str": "2025-01-20T18:00:00Z",
+            "datetime_str": "2025-01-21T19:00:00Z",
+            "description": "Moved practice",
+        })
+        occurrences = self.list_occurrences("2025-01-01", "2025-02-01")
+        self.assertEqual([(o["date"], o["description"]) for o in occurrences], [
+            ("2025-01-06T18:00:00+00:00", "Practice"),
+            ("2025-01-21T19:00:00+00:00", "Moved practice"),
+        ])
+
+    def test_occurrence_moved_past_until(self):
+        """An occurrence moved beyond the rule's end still shows in its new window"""
+        rule_id = self.create_weekly(until="2025-01-20T00:00:00Z")
+        self.client.post(reverse("recurring-occurrence"), {
+            "rule_id": rule_id,
+            "occurrence_str": "2025-01-13T18:00:00Z",
+            "datetime_str": "2025-03-04T18:00:00Z",
+        })
+        occurrences = self.list_occurrences("2025-03-01", "2025-04-01")
+        self.assertEqual([o["date"] for o in occurrences], ["2025-03-04T18:00:00+00:00"])
+
+    def test_exception_must_match_occurrence(self):
+        """Exceptions are only accepted for real occurrences"""
+        rule_id = self.create_weekly()
+        response = self.client.post(reverse("recurring-occurrence"), {
+            "rule_id": rule_id, "occurrence_str": "2025-01-07T18:00:00Z"
+        })
+        self.assertEqual(response.status_code, 404)
+
+
+class CalendarFeedTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="fay", password="testpass")
+        self.client.login(username="fay", password="testpass")
+        self.cal = Calendar.objects.create(name="Mine", user=self.user)
+        self.meeting = Meeting.objects.create(calendar=self.cal, date="2025-03-01T10:00:00Z", description="Standup")
+
+    def get_feed(self, **headers):
+        return self.client.get(reverse("calendar-feed", args=[self.cal.id]), **headers)
+
+    def test_feed_is_ics(self):
+        """The feed streams an iCalendar document"""
+        response = self.get_feed()
+        self.assertEqual(response.status_code, 200)
+        body = b"".join(response.streaming_content).decode()
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertIn("SUMMARY:Standup", body)
+        self.assertIn(f"UID:meeting-{self.meeting.id}@", body)
+
+    def test_feed_not_modified(self):
+        """Polling with the previous ETag is answered with 304 until something changes"""
+        etag = self.get_feed()["ETag"]
+        self.assertEqual(self.get_feed(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Meeting.objects.create(calendar=self.cal, date="2025-03-02T10:00:00Z", description="Retro")
+        response = self.get_feed(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_sync_token_returns_changes(self):
+        """A sync token yields only meetings changed or deleted since it was issued"""
+        token = self.get_feed()["X-Sync-Token"]
+        Meeting.objects.create(calendar=self.cal, date="2025-03-02T10:00:00Z", description="Retro")
+        self.meeting.delete()
+
+        response = self.client.get(reverse("calendar-feed", args=[self.cal.id]), {"sync_token": token})
+        body = b"".join(response.streaming_content).decode()
+        self.assertIn("SUMMARY:Retro", body)
+        self.assertNotIn("SUMMARY:Standup", body)
+        self.assertIn("STATUS:CANCELLED", body)
+        self.assertNotEqual(response["X-Sync-Token"], token)
+
+    def test_sync_token_expires_on_recurrence_change(self):
+        """Recurrence edits are not tracked per row and force a full reload"""
+        token = self.get_feed()["X-Sync-Token"]
+        RecurrenceRule.objects.create(calendar=self.cal, start=timezone.now(), frequency="weekly")
+        response = self.client.get(reverse("calendar-feed", args=[self.cal.id]), {"sync_token": token})
+        self.assertEqual(response.status_code, 410)
+
+    def test_feed_requires_owner(self):
+        """Other users cannot read a personal feed"""
+        User.objects.create_user(username="gus", password="testpass")
+        self.client.login(username="gus", password="testpass")
+        self.assertEqual(self.get_feed().status_code, 403)
+
+    def test_feed_token_without_session(self):
+        """Calendar apps read the feed with the token from the feed link, and lose it on reset"""
+        url = self.client.get(reverse("calendar-feed-link", args=[self.cal.id])).json()["url"]
+        token = url.split("token=")[1]
+        anonymous = Client()
+
+        self.assertEqual(anonymous.get(reverse("calendar-feed", args=[self.cal.id])).status_code, 401)
+        response = anonymous.get(reverse("calendar-feed", args=[self.cal.id]), {"token": token})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("SUMMARY:Standup", b"".join(response.streaming_content).decode())
+
+        self.client.post(reverse("calendar-feed-link", args=[self.cal.id]))
+        response = anonymous.get(reverse("calendar-feed", args=[self.cal.id]), {"token": token})
+        self.assertEqual(response.status_code, 403)
+
+    def test_feed_looks_calendar_up_once(self):
+        """The ETag check and the feed share the calendar and counter lookups"""
+        anonymous = Client()
+        # Calendar, feed sources, meetings, rules
+        with self.assertNumQueries(4):
+            response = anonymous.get(reverse("calendar-feed", args=[self.cal.id]), {"token": self.cal.feed_token})
+            b"".join(response.streaming_content)
+
+
+class MeetingImportTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username="ivy", password="testpass")
+        self.client.login(username="ivy", password="testpass")
+        self.cal = Calendar.objects.create(name="Mine", user=self.user)
+        Meeting.objects.create(calendar=self.cal, date="2025-03-01T10:00:00Z", description="Existing")
+
+    def upload(self, name, content):
+        return self.client.post(reverse("meeting-import"), {
+            "calendar_id": self.cal.id,
+            "file": SimpleUploadedFile(name, content.encode()),
+        })
+
+    def test_import_csv(self):
+        """CSV rows are inserted, existing slots and bad rows are skipped"""
+        response = self.upload("meetings.csv", (
+            "datetime,description\n"
+            "2025-03-01T10:00:00Z,Duplicate\n"
+            "2025-03-08T10:00:00Z,Second\n"
+            "2025-03-08T10:00:00Z,Second again\n"
+            "not a date,Broken\n"
+            "2025-03-15T10:00:00Z,Third\n"
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": True, "created": 2, "duplicates": 2, "invalid": 1})
+        self.assertEqual(Meeting.objects.filter(calendar=self.cal).count(), 3)
+
+    def test_import_ics(self):
+        """VEVENTs are read from an ICS file, folded lines included"""
+        response = self.upload("meetings.ics", (
+            "BEGIN:VCALENDAR\r\n"
+            "BEGIN:VEVENT\r\n"
+            "DTSTART:20250308T100000Z\r\n"
+            "SUMMARY:Planning for the\r\n"
+            "  spring fair\r\n"
+            "END:VEVENT\r\n"
+            "END:VCALENDAR\r\n"
+        ))
+        self.assertEqual(response.json()["created"], 1)
+        self.assertTrue(Meeting.objects.filter(description="Planning for the spring fair").exists())
+
+    def test_import_small_chunks(self):
+        """Chunked inserts still dedupe across chunk boundaries"""
+        base = timezone.now()
+        rows = [(base + timedelta(days=i % 3), f"M{i}") for i in range(7)]
+        counts = import_meetings(self.cal, rows, chunk_size=2)
+        self.assertEqual(counts["created"], 3)
+        self.assertEqual(counts["duplicates"], 4)
@@ -6,6 +6,8 @@ urlpatterns = [
     
     # GET
     path('get/', views.calendars_list, name='calendar-get'),
+    path('<int:cal_id>/feed.ics', views.calendar_feed, name='calendar-feed'),
+    path('<int:cal_id>/feed-link/', views.feed_link, name='calendar-feed-link'),
     
     # POST
     path('create/', views.create_calendar, name='calendar-create'),
@@ -16,9 +18,22 @@ urlpatterns = [
 
     # GET
     path('meetings/list/', views.meetings_list, name='meeting-list'),
+    path('agenda/', views.agenda, name='agenda'),
     
     # POST
     path('meetings/create/', views.create_meeting, name='meeting-create'),
+    path('meetings/bulk/', views.bulk_create_meetings, name='meeting-bulk-create'),
+    path('meetings/import/', views.import_meetings, name='meeting-import'),
     path('meetings/update/', views.update_meeting, name='meeting-update'),
     path('meetings/delete/', views.delete_meeting, name='meeting-delete'),
+
+    # Recurring meetings
+
+    # GET
+    path('recurring/occurrences/', views.occurrences_list, name='recurring-occurrences'),
+
+    # POST
+    path('recurring/create/', views.create_recurring_meeting, name='recurring-create'),
+    path('recurring/delete/', views.delete_recurring_meeting, name='recurring-delete'),
+    path('recurring/occurrence/', views.update_occurrence, name='recurring-occurrence'),
 ]
@@ -1,16 +1,188 @@
 
 from django.http import JsonResponse
-from calendar_app.models import Calendar, Meeting
+from calendar_app.models import Calendar, Meeting, RecurrenceRule, RecurrenceException, DeletedMeeting, new_feed_token
+from calendar_app.feeds import render, meeting_event, cancelled_event, rule_events
+from calendar_app import importers
 from clubs.models import Club, Membership
-from django.utils.dateparse import parse_datetime
-from datetime import datetime
-from django.views.decorators.http import require_POST, require_GET, require_http_methods
+from django.utils.dateparse import parse_datetime, parse_date
+from django.utils import timezone
+from django.db.models import Exists, OuterRef, Q, F
+from django.db import IntegrityError, transaction
+from datetime import datetime, time
+from django.views.decorators.http import require_POST, require_GET, require_http_methods, condition
+from django.http import StreamingHttpResponse
+from functools import reduce
+from itertools import chain, islice
+import hashlib
+import secrets
+from django.urls import reverse
 from urllib.parse import parse_qs
 from .models import User
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 from django.contrib.auth.decorators import login_required
 from users.views import is_member
+from users.permissions import club_with_role, rank_at_least
+import heapq
+import json
+
+''' INTERNAL LOGIC -- NOT CALLED BY URL '''
+def parse_bound(value):
+    ''' Parse an ISO datetime or date query param into an aware datetime '''
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+def meeting_write_denied(user, calendar):
+    ''' Error response if user may not add meetings to calendar, otherwise None '''
+    # Prevent creating meetings in mirror calendars
+    if calendar.is_club_mirror:
+        return JsonResponse({"error": "Cannot create meetings in mirror calendars. Meetings are synced from club calendars."}, status=403)
+
+    # Club calendar
+    if calendar.club:
+        if not is_member(user=user, club=calendar.club, role="organizer"):
+            return JsonResponse({"error" : "Only club organizers can create meetings"}, status=403)
+        return None
+
+    # User calendar
+    if calendar.user != user:
+        return JsonResponse({"error": "this calendar does not belong to you"}, status=403)
+    return None
+
+def window_meetings(meetings, params):
+    ''' Narrow meetings to a [start, end) window and a keyset page, ordered by date.
+    The client passes the date and id of the last meeting it has as after/after_id,
+    or after/after_rule_id if the last item was a recurring occurrence (which sorts
+    after the meetings of its date). Raises ValueError on malformed params '''
+    if params.get("start"):
+        meetings = meetings.filter(date__gte=parse_bound(params["start"]))
+    if params.get("end"):
+        meetings = meetings.filter(date__lt=parse_bound(params["end"]))
+
+    if params.get("after"):
+        after = parse_bound(params["after"])
+        if params.get("after_rule_id"):
+            meetings = meetings.filter(date__gt=after)
+        else:
+            after_id = int(params.get("after_id", 0))
+            meetings = meetings.filter(Q(date__gt=after) | Q(date=after, id__gt=after_id))
+
+    meetings = meetings.order_by("date", "id")
+
+    if params.get("limit"):
+        limit = int(params["limit"])
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        meetings = meetings[:limit]
+    return meetings
+
+def rules_in_window(rules, start, end):
+    ''' Rules that may have an occurrence in [start, end): within their own bounds,
+    or through an occurrence moved into the window from outside them '''
+    moved_in = RecurrenceException.objects.filter(
+        rule=OuterRef("pk"), cancelled=False, date__gte=start, date__lt=end
+    )
+    in_bounds = Q(start__lt=end) & (Q(until__isnull=True) | Q(until__gte=start))
+    return rules.filter(in_bounds | Exists(moved_in)).prefetch_related("exceptions")
+
+def window_occurrences(rules, params):
+    ''' Lazily expand rules over the params' [start, end) window after the keyset
+    cursor of window_meetings, as (date, rule, description) ordered by date and
+    rule id. Raises ValueError on malformed params '''
+    start, end = parse_bound(params["start"]), parse_bound(params["end"])
+    after = parse_bound(params["after"]) if params.get("after") else None
+    after_rule_id = int(params["after_rule_id"]) if params.get("after_rule_id") else None
+    lower = max(start, after) if after else start
+
+    def expand(rule):
+        for date, description in rule.occurrences(lower, end):
+            # Occurrences on the cursor's date follow its meetings, then go by rule id
+            if date == after and after_rule_id is not None and rule.id <= after_rule_id:
+                continue
+            yield (date, rule, description)
+
+    rules = rules_in_window(rules, start, end).order_by("id")
+    return heapq.merge(*(expand(rule) for rule in rules), key=lambda occurrence: occurrence[0])
+
+def merge_page(meetings, occurrences, params):
+    ''' Merge meeting and occurrence items (each already in order) into one page,
+    meetings first within a date, cut at the limit param '''
+    merged = heapq.merge(meetings, occurrences, key=lambda item: (item["date"], item["rule_id"] is not None))
+    if params.get("limit"):
+        merged = islice(merged, int(params["limit"]))
+    return [{**item, "date": item["date"].isoformat()} for item in merged]
+
+def feed_access_denied(user, calendar):
+    ''' Error response if user may not read calendar's feed, otherwise None '''
+    if calendar.club:
+        if not is_member(user=user, club=calendar.club):
+            return JsonResponse({"error" : "You are not a member of this club"}, status=403)
+        return None
+    if calendar.user != user:
+        return JsonResponse({"error" : "this calendar does not belong to you"}, status=403)
+    return None
+
+def feed_request_denied(request, calendar):
+    '''
+    Error response if the request may not read calendar's feed, otherwise None.
+    Subscribed calendar apps send the feed token; signed-in users need none.
+    '''
+    token = request.GET.get("token")
+    if token:
+        if not secrets.compare_digest(token, calendar.feed_token):
+            return JsonResponse({"error": "invalid feed token"}, status=403)
+        return None
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "feed token required"}, status=401)
+    return feed_access_denied(request.user, calendar)
+
+def feed_state(calendar):
+    ''' Source calendars (id, name, version, rules_version) and the current sync token '''
+    sources = list(calendar.feed_sources().values_list("id", "name", "version", "rules_version"))
+    token = "-".join(f"{cal_id}.{version}" for cal_id, _, version, _ in sources) or "empty"
+    return sources, token
+
+def parse_sync_token(token):
+    ''' Map of calendar id -> version from a sync token. Raises ValueError if malformed '''
+    if token == "empty":
+        return {}
+    since = {}
+    for part in token.split("-"):
+        cal_id, version = part.split(".")
+        since[int(cal_id)] = int(version)
+    return since
+
+def load_feed(request, cal_id):
+    '''
+    (calendar or None, error response or None, feed_state or None) for a feed
+    request, kept on the request so the ETag check and the view share one lookup
+    '''
+    if not hasattr(request, "_feed"):
+        try:
+            calendar = Calendar.objects.get(id=cal_id)
+        except Calendar.DoesNotExist:
+            request._feed = (None, JsonResponse({"error": "Calendar not found"}, status=404), None)
+            return request._feed
+        denied = feed_request_denied(request, calendar)
+        request._feed = (calendar, denied, None if denied else feed_state(calendar))
+    return request._feed
+
+def feed_etag(request, cal_id):
+    '''
+    ETag from the calendar's change counters; None skips conditional handling.
+    Weak, since each response carries a fresh DTSTAMP.
+    '''
+    calendar, denied, state = load_feed(request, cal_id)
+    if denied:
+        return None
+    _, token = state
+    key = f"{calendar.id}.{calendar.version}/{token}/{request.GET.get('sync_token', '')}"
+    return 'W/"%s"' % hashlib.sha1(key.encode()).hexdigest()
 
 '''CALENDARS'''
 
@@ -29,11 +201,11 @@ def create_calendar(request):
     if club_id:
         
         try:
-            club = Club.objects.get(id=club_id)
+            club, role = club_with_role(request.user, club_id)
         except Club.DoesNotExist:
             return JsonResponse({"error" : "Club not found"}, status=404)
         
-        if not is_member(user=request.user, club=club, role="organizer"):
+        if not rank_at_least(role, "organizer"):
             return JsonResponse({"error" : "You are not a leader of this club"}, status=403)
         
         calendar = Calendar.objects.create(name=calendar_name, club=club, user=None)
@@ -55,12 +227,12 @@ def calendars_list(request):
     if club_id:  
         # Get the club from ID
         try:
-            club = Club.objects.get(id=club_id)
+            club, role = club_with_role(request.user, club_id)
         except Club.DoesNotExist:
             return JsonResponse({"error": "Club not found"}, status=404)
         
         # Check permissions
-        if not Membership.objects.filter(user=request.user, club=club).exists():
+        if role is None:
             return JsonResponse({"error" : "You are not a member of this club"}, status=403)
         
         # List of calendars associated with the club
@@ -84,7 +256,86 @@ def calendars_list(request):
                 for cal in user.calendars.all()
                 ]
         return JsonResponse(allCals, safe=False)
-  
+ 
+@require_GET
+@condition(etag_func=feed_etag)
+def calendar_feed(request, cal_id):
+    '''
+    Stream a calendar as iCalendar; ?sync_token= returns only changes since
+    that token. Open to signed-in readers and to ?token=<feed token>.
+    '''
+    calendar, denied, state = load_feed(request, cal_id)
+    if denied:
+        return denied
+
+    sources, token = state
+    names = {cal_id: name for cal_id, name, _, _ in sources}
+
+    def describe(source_id):
+        # Mirror calendars show club meetings tagged with their source calendar
+        if calendar.is_club_mirror:
+            return lambda text: f"[{names[source_id]}] {text or ''}"
+        return lambda text: text
+
+    sync_token = request.GET.get("sync_token")
+    if sync_token:
+        try:
+            since = parse_sync_token(sync_token)
+        except ValueError:
+            return JsonResponse({"error": "Invalid sync token"}, status=400)
+
+        # Tokens only track meetings; a dropped calendar or a recurrence edit needs a full reload
+        current = {cal_id: rules_version for cal_id, _, _, rules_version in sources}
+        if any(cal_id not in current for cal_id in since) or any(
+            rules_version > since.get(cal_id, 0) for cal_id, rules_version in current.items()
+        ):
+            return JsonResponse({"error": "Sync token expired, fetch the full feed"}, status=410)
+
+        changed = [Q(calendar_id=cal_id, version__gt=since.get(cal_id, 0)) for cal_id in current]
+        meetings = Meeting.objects.filter(reduce(Q.__or__, changed)) if changed else Meeting.objects.none()
+        deleted = DeletedMeeting.objects.filter(reduce(Q.__or__, changed)) if changed else DeletedMeeting.objects.none()
+        rules = RecurrenceRule.objects.none()
+    else:
+        meetings = Meeting.objects.filter(calendar_id__in=names)
+        deleted = DeletedMeeting.objects.none()
+        rules = RecurrenceRule.objects.filter(calendar_id__in=names).prefetch_related("exceptions")
+
+    events = chain(
+        (meeting_event(meet, describe(meet.calendar_id)(meet.description)) for meet in meetings.order_by("date").iterator()),
+        (cancelled_event(gone) for gone in deleted.iterator()),
+        (rule_events(rule, describe(rule.calendar_id)) for rule in rules),
+    )
+    response = StreamingHttpResponse(render(calendar.name, events), content_type="text/calendar; charset=utf-8")
+    response["X-Sync-Token"] = token
+    return response
+
+@login_required
+@require_http_methods(["GET", "POST"])
+def feed_link(request, cal_id):
+    '''
+    Subscription URL of a calendar's feed, for readers of the calendar. POST
+    issues a new token, cutting off every app holding the old URL; that is
+    for the owner, or an organizer of a club calendar.
+    '''
+    try:
+        calendar = Calendar.objects.get(id=cal_id)
+    except Calendar.DoesNotExist:
+        return JsonResponse({"error": "Calendar not found"}, status=404)
+
+    denied = feed_access_denied(request.user, calendar)
+    if denied:
+        return denied
+
+    if request.method == "POST":
+        if calendar.club and not is_member(user=request.user, club=calendar.club, role="organizer"):
+            return JsonResponse({"error": "Only club organizers can reset the feed link"}, status=403)
+        calendar.feed_token = new_feed_token()
+        calendar.save(update_fields=["feed_token"])
+
+    url = request.build_absolute_uri(reverse("calendar-feed", args=[calendar.id]))
+    return JsonResponse({"url": f"{url}?token={calendar.feed_token}"})
+
+ 
 @login_required
 @require_POST
 def update_calendar(request):
@@ -108,6 +359,7 @@ def update_calendar(request):
             return JsonResponse({"error" : "this calendar does not belong to you"}, status=403)
         
         calendar.name = cal_name
+        calendar.version = F("version") + 1
         calendar.save()
         return JsonResponse({"status": True})
     
@@ -120,6 +372,7 @@ def update_calendar(request):
             return JsonResponse({"error": "A calendar with this name already exists"}, status=409)
         
         calendar.name = cal_name
+        calendar.version = F("version") + 1
         calendar.save()
         return JsonResponse({"status": True})
     
@@ -174,40 +427,112 @@ def create_meeting(request):
     except Calendar.DoesNotExist:
         return JsonResponse({"error": "Calendar not found"}, status=404)
 
-    # Prevent creating meetings in mirror calendars
-    if calendar.is_club_mirror:
-        return JsonResponse({"error": "Cannot create meetings in mirror calendars. Meetings are synced from club calendars."}, status=403)
+    denied = meeting_write_denied(request.user, calendar)
+    if denied:
+        return denied
 
-    # Club calendar
-    if calendar.club:
-        if not is_member(user=request.user, club=calendar.club, role="organizer"):
-            return JsonResponse({"error" : "Only club organizers can create meetings"}, status=403) 
-        meets = Meeting.objects.filter(calendar=calendar)
-        for meet in meets:
-            if meet.date == date:
-                return JsonResponse({"error" : "Meeting already exists at this time"}, status=409)
-        
-        meeting = Meeting.objects.create(calendar=calendar, date=date, description=description)
+    # The (calendar, date) unique constraint rejects a second meeting in the same slot
+    try:
+        with transaction.atomic():
+            meeting = Meeting.objects.create(calendar=calendar, date=date, description=description)
+    except IntegrityError:
+        return JsonResponse({"error" : "Meeting already exists at this time"}, status=409)
 
-        return JsonResponse({"status": True, "meet_id": meeting.id})
-    
-    # User calendar
-    if calendar.user:
-        if calendar.user != request.user:
-            return JsonResponse({"error": "this calendar does not belong to you"}, status=403)
-        
-        meets = Meeting.objects.filter(calendar=calendar)
-        for meet in meets:
-            if meet.date == date:
-                return JsonResponse({"error" : "Meeting already exists at this time"}, status=409)
-        
-        meeting = Meeting.objects.create(calendar=calendar, date=date, description=description)
+    return JsonResponse({"status" : True, "meet_id": meeting.id})
+
+@require_POST
+@login_required
+def bulk_create_meetings(request):
+    '''Create a batch of meetings on one calendar; all or nothing'''
+    calendar_id = request.POST.get("calendar_id")
+    meetings_json = request.POST.get("meetings")
+
+    if not calendar_id or not meetings_json:
+        return JsonResponse({"error": "Missing required fields"}, status=400)
+
+    try:
+        entries = json.loads(meetings_json)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON for meetings"}, status=400)
+    if not isinstance(entries, list) or not entries:
+        return JsonResponse({"error": "meetings must be a non-empty list"}, status=400)
+
+    try:
+        calendar = Calendar.objects.get(id=calendar_id)
+    except Calendar.DoesNotExist:
+        return JsonResponse({"error": "Calendar not found"}, status=404)
+
+    denied = meeting_write_denied(request.user, calendar)
+    if denied:
+        return denied
+
+    new_meetings = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("datetime_str") or not entry.get("description"):
+            return JsonResponse({"error": "Each meeting needs datetime_str and description"}, status=400)
+        try:
+            date = parse_bound(entry["datetime_str"])
+        except ValueError:
+            return JsonResponse({"error": f"Invalid date format: {entry['datetime_str']}"}, status=400)
+        new_meetings.append(Meeting(calendar=calendar, date=date, description=entry["description"]))
+
+    dates = [meet.date for meet in new_meetings]
+    if len(set(dates)) != len(dates):
+        return JsonResponse({"error": "Batch contains two meetings at the same time"}, status=409)
+
+    # One indexed lookup for the whole batch
+    taken = Meeting.objects.filter(calendar=calendar, date__in=dates).values_list("date", flat=True)
+    if taken:
+        return JsonResponse({
+            "error": "Meeting already exists at this time",
+            "conflicts": [date.isoformat() for date in taken]
+        }, status=409)
+
+    try:
+        with transaction.atomic():
+            # bulk_create skips the pre_save signal, so stamp the batch here
+            version = Calendar.bump_version(calendar.id)
+            for meet in new_meetings:
+                meet.version = version
+            created = Meeting.objects.bulk_create(new_meetings)
+    except IntegrityError:
+        return JsonResponse({"error": "Meeting already exists at this time"}, status=409)
+
+    return JsonResponse({"status": True, "meet_ids": [meet.id for meet in created]})
+
+@require_POST
+@login_required
+def import_meetings(request):
+    '''Import meetings from an uploaded CSV or ICS file, skipping slots already taken'''
+    calendar_id = request.POST.get("calendar_id")
+    upload = request.FILES.get("file")
+
+    if not calendar_id or not upload:
+        return JsonResponse({"error": "Missing required fields"}, status=400)
+
+    file_format = request.POST.get("format") or upload.name.rsplit(".", 1)[-1].lower()
+    if file_format not in ("csv", "ics"):
+        return JsonResponse({"error": "Unsupported file format, use csv or ics"}, status=400)
+
+    try:
+        calendar = Calendar.objects.get(id=calendar_id)
+    except Calendar.DoesNotExist:
+        return JsonResponse({"error": "Calendar not found"}, status=404)
+
+    denied = meeting_write_denied(request.user, calendar)
+    if denied:
+        return denied
 
-        return JsonResponse({"status" : True, "meet_id": meeting.id})
+    # Decode and parse line by line rather than reading the whole upload
+    lines = (line.decode("utf-8-sig", errors="replace") for line in upload)
+    parser = importers.parse_csv if file_format == "csv" else importers.parse_ics
+    counts = importers.import_meetings(calendar, parser(lines))
+
+    return JsonResponse({"status": True, **counts})
 
 @login_required
 def meetings_list(request):
-    '''List meetings for a calendar'''
+    '''List meetings for a calendar, ordered by date'''
     calendar_id = request.GET.get("calendar_id")
     if not calendar_id:
         return JsonResponse({"error" : "Missing id field"}, status=400)
@@ -220,13 +545,85 @@ def meetings_list(request):
     if calendar.club is not None:
         if not Membership.objects.filter(user=request.user, club=calendar.club).exists():
             return JsonResponse({"error" : "You are not a member of this club"}, status=403)
-    allMeets = []
-    for meet in calendar.meetings.all():
-        allMeets.append({
-            "id" : meet.id, 
-            "date" : meet.date.isoformat(),
-            "description" : meet.description
-            })
+    if calendar.is_club_mirror and calendar.user != request.user:
+        return JsonResponse({"error" : "this calendar does not belong to you"}, status=403)
+
+    # Mirror calendars show club meetings tagged with their source calendar
+    def describe(row, description):
+        if calendar.is_club_mirror:
+            return f"[{row.calendar.name}] {description or ''}"
+        return description
+
+    # Optional date window and keyset page. Recurring meetings are expanded
+    # into the same stream when the window is closed at both ends
+    try:
+        meetings = window_meetings(calendar.resolve_meetings(), request.GET)
+        occurrences = iter(())
+        if request.GET.get("start") and request.GET.get("end"):
+            occurrences = window_occurrences(calendar.resolve_rules(), request.GET)
+        allMeets = merge_page(
+            (
+                {"id" : meet.id, "rule_id" : None, "date" : meet.date, "description" : describe(meet, meet.description)}
+                for meet in meetings
+            ),
+            (
+                {"id" : None, "rule_id" : rule.id, "date" : date, "description" : describe(rule, description)}
+                for date, rule, description in occurrences
+            ),
+            request.GET,
+        )
+    except ValueError as e:
+        return JsonResponse({"error" : str(e)}, status=400)
+    return JsonResponse(allMeets, safe=False)
+
+@login_required
+@require_GET
+def agenda(request):
+    '''Meetings and recurring occurrences from all of the user's calendars and clubs
+    in a date window, merged by date into one keyset-paged stream'''
+    if not request.GET.get("start") or not request.GET.get("end"):
+        return JsonResponse({"error" : "Missing start or end"}, status=400)
+
+    # Personal calendars plus every calendar of a club the user belongs to;
+    # mirror calendars have no rows of their own so they are covered by the club side
+    club_ids = Membership.objects.filter(user=request.user).values("club_id")
+    calendars = Q(calendar__user=request.user, calendar__is_club_mirror=False) | Q(calendar__club_id__in=club_ids)
+    meetings = Meeting.objects.filter(calendars).values(
+        "id", "date", "description", "calendar_id", "calendar__name", "calendar__club_id"
+    )
+    rules = RecurrenceRule.objects.filter(calendars).select_related("calendar")
+
+    try:
+        meetings = window_meetings(meetings, request.GET)
+        allMeets = merge_page(
+            (
+                {
+                    "id" : meet["id"],
+                    "rule_id" : None,
+                    "date" : meet["date"],
+                    "description" : meet["description"],
+                    "calendar_id" : meet["calendar_id"],
+                    "calendar_name" : meet["calendar__name"],
+                    "club_id" : meet["calendar__club_id"],
+                }
+                for meet in meetings.iterator()
+            ),
+            (
+                {
+                    "id" : None,
+                    "rule_id" : rule.id,
+                    "date" : date,
+                    "description" : description,
+                    "calendar_id" : rule.calendar_id,
+                    "calendar_name" : rule.calendar.name,
+                    "club_id" : rule.calendar.club_id,
+                }
+                for date, rule, description in window_occurrences(rules, request.GET)
+            ),
+            request.GET,
+        )
+    except ValueError as e:
+        return JsonResponse({"error" : str(e)}, status=400)
     return JsonResponse(allMeets, safe=False)
  
 @login_required
@@ -242,10 +639,6 @@ def update_meeting(request):
     except Meeting.DoesNotExist:
         return JsonResponse({"error": "Meeting not found"}, status=404)
 
-    # Prevent editing mirror meetings directly
-    if meeting.is_mirror:
-        return JsonResponse({"error": "Cannot edit mirror meetings directly. Edit the original meeting in the club calendar."}, status=403)
-
     calendar = meeting.calendar
 
     # Club
@@ -253,7 +646,8 @@ def update_meeting(request):
         if not is_member(user=request.user, club=calendar.club, role="organizer"):
             return JsonResponse({"error" : "Only club organizers can edit club meetings"}, status=403)
         meeting.description = desc
-        meeting.save()
+        with transaction.atomic():
+            meeting.save()
         return JsonResponse({"status": True})
 
     # User
@@ -264,7 +658,8 @@ def update_meeting(request):
         if calendar.is_club_mirror:
             return JsonResponse({"error": "Cannot edit meetings in mirror calendars"}, status=403)
         meeting.description = desc
-        meeting.save()
+        with transaction.atomic():
+            meeting.save()
         return JsonResponse({"status": True})
 
     return JsonResponse({"status" : False})
@@ -281,10 +676,6 @@ def delete_meeting(request):
     except Meeting.DoesNotExist:
         return JsonResponse({"error": "Meeting not found"}, status=404)
 
-    # Prevent deleting mirror meetings directly
-    if meeting.is_mirror:
-        return JsonResponse({"error": "Cannot delete mirror meetings directly. Delete the original meeting in the club calendar."}, status=403)
-
     calendar = meeting.calendar
 
     # Club
@@ -305,3 +696,162 @@ def delete_meeting(request):
         return JsonResponse({"status": True})
 
     return JsonResponse({"status" : False})
+
+
+'''RECURRING MEETINGS'''
+
+@require_POST
+@login_required
+def create_recurring_meeting(request):
+    calendar_id = request.POST.get("calendar_id")
+    datetime_str = request.POST.get("datetime_str")
+    description = request.POST.get("description")
+    frequency = request.POST.get("frequency")
+    interval = request.POST.get("interval", "1")
+    until_str = request.POST.get("until")
+    count = request.POST.get("count")
+
+    if not calendar_id or not datetime_str or not description or not frequency:
+        return JsonResponse({"error": "Missing required fields"}, status=400)
+
+    if frequency not in dict(RecurrenceRule.FREQUENCY_CHOICES):
+        return JsonResponse({"error": "Invalid frequency"}, status=400)
+
+    start = parse_datetime(datetime_str)
+    until = parse_datetime(until_str) if until_str else None
+    if not start or (until_str and not until):
+        return JsonResponse({"error": "Invalid date format"}, status=400)
+
+    try:
+        interval = int(interval)
+        count = int(count) if count else None
+    except ValueError:
+        return JsonResponse({"error": "interval and count must be integers"}, status=400)
+    if interval < 1 or (count is not None and count < 1):
+        return JsonResponse({"error": "interval and count must be positive"}, status=400)
+    if until and until < start:
+        return JsonResponse({"error": "until must not be before the first meeting"}, status=400)
+
+    try:
+        calendar = Calendar.objects.get(id=calendar_id)
+    except Calendar.DoesNotExist:
+        return JsonResponse({"error": "Calendar not found"}, status=404)
+
+    denied = meeting_write_denied(request.user, calendar)
+    if denied:
+        return denied
+
+    rule = RecurrenceRule.objects.create(
+        calendar=calendar,
+        description=description,
+        start=start,
+        frequency=frequency,
+        interval=interval,
+        until=until,
+        count=count
+    )
+    return JsonResponse({"status": True, "rule_id": rule.id})
+
+@require_POST
+@login_required
+def delete_recurring_meeting(request):
+    rule_id = request.POST.get("rule_id")
+    if not rule_id:
+        return JsonResponse({"error": "Missing required fields"}, status=400)
+
+    try:
+        rule = RecurrenceRule.objects.select_related("calendar").get(id=rule_id)
+    except RecurrenceRule.DoesNotExist:
+        return JsonResponse({"error": "Recurring meeting not found"}, status=404)
+
+    denied = meeting_write_denied(request.user, rule.calendar)
+    if denied:
+        return denied
+
+    rule.delete()
+    return JsonResponse({"status": True})
+
+@require_POST
+@login_required
+def update_occurrence(request):
+    '''Cancel, move or re-describe one occurrence of a recurring meeting'''
+    rule_id = request.POST.get("rule_id")
+    occurrence_str = request.POST.get("occurrence_str")
+    datetime_str = request.POST.get("datetime_str")
+    description = request.POST.get("description")
+
+    if not rule_id or not occurrence_str:
+        return JsonResponse({"error": "Missing required fields"}, status=400)
+
+    try:
+        original_date = parse_bound(occurrence_str)
+        new_date = parse_bound(datetime_str) if datetime_str else None
+    except ValueError:
+        return JsonResponse({"error": "Invalid date format"}, status=400)
+
+    try:
+        rule = RecurrenceRule.objects.select_related("calendar").get(id=rule_id)
+    except RecurrenceRule.DoesNotExist:
+        return JsonResponse({"error": "Recurring meeting not found"}, status=404)
+
+    denied = meeting_write_denied(request.user, rule.calendar)
+    if denied:
+        return denied
+
+    if not rule.is_occurrence(original_date):
+        return JsonResponse({"error": "No occurrence at this time"}, status=404)
+
+    # Neither a new time nor a new description cancels the occurrence
+    cancelled = not datetime_str and not description
+    RecurrenceException.objects.update_or_create(
+        rule=rule,
+        original_date=original_date,
+        defaults={
+            "cancelled": cancelled,
+            "date": None if cancelled else (new_date or original_date),
+            "description": description or None,
+        }
+    )
+    return JsonResponse({"status": True, "cancelled": cancelled})
+
+@login_required
+@require_GET
+def occurrences_list(request):
+    '''Expand a calendar's recurring meetings over a date window'''
+    calendar_id = request.GET.get("calendar_id")
+    if not calendar_id or not request.GET.get("start") or not request.GET.get("end"):
+        return JsonResponse({"error" : "Missing required fields"}, status=400)
+
+    try:
+        start = parse_bound(request.GET["start"])
+        end = parse_bound(request.GET["end"])
+    except ValueError as e:
+        return JsonResponse({"error" : str(e)}, status=400)
+
+    try:
+        calendar = Calendar.objects.get(id=calendar_id)
+    except Calendar.DoesNotExist:
+        return JsonResponse({"error" : "Calendar does not exist"}, status=404)
+    if calendar.club is not None:
+        if not Membership.objects.filter(user=request.user, club=calendar.club).exists():
+            return JsonResponse({"error" : "You are not a member of this club"}, status=403)
+    if calendar.user and calendar.user != request.user:
+        return JsonResponse({"error" : "this calendar does not belong to you"}, status=403)
+
+    # Rules that could have an occurrence in the window
+    rules = rules_in_window(calendar.resolve_rules(), start, end)
+
+    def expand(rule):
+        for date, description in rule.occurrences(start, end):
+            # Mirror calendars show club meetings tagged with their source calendar
+            if calendar.is_club_mirror:
+                description = f"[{rule.calendar.name}] {description or ''}"
+            yield {"rule_id": rule.id, "date": date, "description": description}
+
+    # Each rule expands lazily in date order; merge them into one stream
+    merged = heapq.merge(*(expand(rule) for rule in rules), key=lambda occurrence: occurrence["date"])
+    allOccurrences = [
+        {**occurrence, "date": occurrence["date"].isoformat()}
+        for occurrence in merged
+    ]
+    return JsonResponse(allOccurrences, safe=False)
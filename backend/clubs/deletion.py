@@ -0,0 +1,73 @@
+from collections import Counter
+from django.db import connections, transaction
+from django.db.models import Q
+from calendar_app.models import Calendar, Meeting, DeletedMeeting, RecurrenceRule, RecurrenceException
+from document.models import DocumentManager, Document
+from networking.stats import refresh_counters
+from users.permissions import invalidate_club_roles
+from .models import Club, Membership, MergeRequest
+
+
+def delete_rows(qs):
+    '''
+    Delete qs's rows with one DELETE statement and return how many went. The
+    collector is bypassed, so no signals fire and no on_delete is applied:
+    every table pointing at qs's model must already be cleared by the caller.
+    '''
+    connection = connections[qs.db]
+    quote = connection.ops.quote_name
+    select, params = qs.values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(qs.model._meta.db_table)} WHERE {quote(qs.model._meta.pk.column)} IN ({select})",
+            params,
+        )
+        return cursor.rowcount
+
+
+def delete_club_graph(club):
+    '''
+    Delete a club and everything hanging off it with a fixed number of
+    set-based statements in one transaction, however large the club is.
+    Uploaded files are left on disk for `manage.py sweep_media` to remove.
+    Returns the number of rows deleted per model.
+    '''
+    deleted = Counter()
+
+    with transaction.atomic():
+        # Club calendars and every member's mirror of them
+        calendars = Calendar.objects.filter(Q(club=club) | Q(source_club=club))
+        calendar_ids = calendars.values("id")
+
+        # Meetings and recurrences carry post_delete receivers, and a club can
+        # have one mirror calendar per member, so a regular delete() would load
+        # every row into memory. The calendars go as a whole, children first,
+        # so delete them directly instead. A new model with a foreign key to
+        # any of these tables has to be added to this list
+        for qs in (
+            RecurrenceException.objects.filter(rule__calendar_id__in=calendar_ids),
+            RecurrenceRule.objects.filter(calendar_id__in=calendar_ids),
+            Meeting.objects.filter(calendar_id__in=calendar_ids),
+            DeletedMeeting.objects.filter(calendar_id__in=calendar_ids),
+            calendars,
+        ):
+            deleted[qs.model._meta.label] += delete_rows(qs)
+
+        # Memberships carry receivers that recount each member's networking
+        # stats and drop their cached roles; do that once for all members instead
+        members = Membership.objects.filter(club=club)
+        member_ids = list(members.values_list("user_id", flat=True))
+        deleted[Membership._meta.label] += delete_rows(members)
+        transaction.on_commit(lambda: refresh_counters(member_ids))
+        invalidate_club_roles(member_ids)
+
+        for qs in (
+            Document.objects.filter(document_manager__club=club),
+            DocumentManager.objects.filter(club=club),
+            MergeRequest.objects.filter(Q(club_1=club) | Q(club_2=club) | Q(merged_club=club)),
+            Club.objects.filter(pk=club.pk),
+        ):
+            _, per_model = qs.delete()
+            deleted.update(per_model)
+
+    return dict(deleted)
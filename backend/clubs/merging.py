@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models import Max
+from calendar_app.models import Calendar, Meeting, RecurrenceRule, RecurrenceException
+from calendar_app.mirrors import sync_mirror_calendars
+from document.models import DocumentManager, Document
+from networking.stats import refresh_counters
+from users.permissions import invalidate_club_roles
+from .models import Membership, ROLE_RANKS
+
+BATCH_SIZE = 1000
+
+
+def merge_memberships(clubs, new_club):
+    '''
+    Give new_club the union of the clubs' members. A user in several clubs
+    keeps their highest role, decided in SQL. Members' cached roles are dropped
+    and their networking counters recounted after commit. Returns the number
+    of memberships created
+    '''
+    best = (
+        Membership.objects.filter(club__in=clubs)
+        .values("user_id")
+        .annotate(best_rank=Max("rank"))
+        .values_list("user_id", "best_rank")
+    )
+    role_for_rank = {value: role for role, value in ROLE_RANKS.items()}
+    created = Membership.objects.bulk_create(
+        (Membership(user_id=user_id, club=new_club, role=role_for_rank[rank]) for user_id, rank in best.iterator()),
+        batch_size=BATCH_SIZE,
+    )
+    member_ids = [membership.user_id for membership in created]
+    transaction.on_commit(lambda: refresh_counters(member_ids))
+    invalidate_club_roles(member_ids)
+    return len(created)
+
+def copy_calendars(clubs, new_club):
+    ''' Copy the clubs' calendars, meetings and recurring meetings into new_club '''
+    sources = list(Calendar.objects.filter(club__in=clubs).select_related("club").order_by("id"))
+    copies = Calendar.objects.bulk_create([
+        Calendar(name=f"{cal.club.name}: {cal.name}"[:Calendar._meta.get_field("name").max_length], club=new_club)
+        for cal in sources
+    ])
+    calendar_map = {source.id: copy.id for source, copy in zip(sources, copies)}
+
+    Meeting.objects.bulk_create(
+        (
+            Meeting(calendar_id=calendar_map[meet["calendar_id"]], date=meet["date"], description=meet["description"])
+            for meet in Meeting.objects.filter(calendar_id__in=calendar_map)
+            .values("calendar_id", "date", "description").iterator()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    rules = list(RecurrenceRule.objects.filter(calendar_id__in=calendar_map).prefetch_related("exceptions"))
+    rule_copies = RecurrenceRule.objects.bulk_create([
+        RecurrenceRule(
+            calendar_id=calendar_map[rule.calendar_id],
+            description=rule.description,
+            start=rule.start,
+            frequency=rule.frequency,
+            interval=rule.interval,
+            until=rule.until,
+            count=rule.count,
+        )
+        for rule in rules
+    ])
+    RecurrenceException.objects.bulk_create([
+        RecurrenceException(
+            rule=copy,
+            original_date=exc.original_date,
+            cancelled=exc.cancelled,
+            date=exc.date,
+            description=exc.description,
+        )
+        for rule, copy in zip(rules, rule_copies)
+        for exc in rule.exceptions.all()
+    ])
+    return len(copies)
+
+def copy_documents(clubs, new_club):
+    ''' Copy the clubs' document managers into new_club; documents share the stored files '''
+    sources = list(DocumentManager.objects.filter(club__in=clubs).select_related("club").order_by("id"))
+    copies = DocumentManager.objects.bulk_create([
+        DocumentManager(name=f"{manager.club.name}: {manager.name}"[:DocumentManager._meta.get_field("name").max_length], club=new_club)
+        for manager in sources
+    ])
+    manager_map = {source.id: copy.id for source, copy in zip(sources, copies)}
+
+    Document.objects.bulk_create(
+        (
+            Document(document_manager_id=manager_map[doc["document_manager_id"]], title=doc["title"], file=doc["file"])
+            for doc in Document.objects.filter(document_manager_id__in=manager_map)
+            .values("document_manager_id", "title", "file").iterator()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return len(copies)
+
+def merge_clubs(clubs, new_club, calendars=False, documents=False):
+    '''
+    Fill new_club from the given clubs in one transaction: memberships always,
+    calendars and document managers on request. Returns counts of what was created
+    '''
+    with transaction.atomic():
+        counts = {"memberships": merge_memberships(clubs, new_club)}
+        counts["mirror_calendars"] = sync_mirror_calendars(new_club)["created"]
+        if calendars:
+            counts["calendars"] = copy_calendars(clubs, new_club)
+        if documents:
+            counts["document_managers"] = copy_documents(clubs, new_club)
+    return counts
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:39
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0005_alter_club_tags'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='club',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='club_tags_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['name', 'id'], name='club_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import F, Func, TextField, Value
+
+
+def fill_search_vectors(apps, schema_editor):
+    ''' Build the search vector for existing clubs (same weights as clubs.search) '''
+    Club = apps.get_model('clubs', 'Club')
+    tags = Func(F('tags'), Value(' '), function='array_to_string', output_field=TextField())
+    Club.objects.update(search_vector=(
+        SearchVector('name', weight='A', config='english')
+        + SearchVector(tags, weight='B', config='english')
+        + SearchVector('summary', weight='B', config='english')
+        + SearchVector('description', weight='C', config='english')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0006_club_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='club',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='club_search_vector_gin'),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0007_club_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='membership',
+            name='role',
+            field=models.CharField(choices=[('member', 'Member'), ('organizer', 'Organizer'), ('admin', 'Admin')], default='member', max_length=50),
+        ),
+        # The covering unique index replaces the unique_together one; it is
+        # built first so the pair is never left unguarded
+        migrations.AddConstraint(
+            model_name='membership',
+            constraint=models.UniqueConstraint(fields=('user', 'club'), include=('role',), name='membership_user_club'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='membership',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['club', 'user'], include=('role',), name='membership_club_user_idx'),
+        ),
+    ]
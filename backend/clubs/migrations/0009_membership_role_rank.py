@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0008_membership_covering_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='membership',
+            name='membership_user_club',
+        ),
+        migrations.RemoveIndex(
+            model_name='membership',
+            name='membership_club_user_idx',
+        ),
+        migrations.AddField(
+            model_name='membership',
+            name='rank',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(role='member', then=models.Value(1)), models.When(role='organizer', then=models.Value(2)), models.When(role='admin', then=models.Value(3)), default=models.Value(0)), output_field=models.PositiveSmallIntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['club', 'user'], include=('role', 'rank'), name='membership_club_user_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='membership',
+            constraint=models.UniqueConstraint(fields=('user', 'club'), include=('role', 'rank'), name='membership_user_club'),
+        ),
+    ]
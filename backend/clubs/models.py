@@ -1,6 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from users.models import User
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 
 # Club model
 class Club(models.Model):
@@ -16,10 +18,34 @@ class Club(models.Model):
         blank=True
     )
     lastMeetingDate = models.DateField(null=True, blank=True)
+    # Weighted name/tags/summary/description vector, kept up to date by clubs.signals
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Full-text club search
+            GinIndex(fields=["search_vector"], name="club_search_vector_gin"),
+            # Tag filters (tags @> / && ...) in the club directory
+            GinIndex(fields=["tags"], name="club_tags_gin"),
+            # Keyset pagination by name
+            models.Index(fields=["name", "id"], name="club_name_id_idx"),
+        ]
     
     def __str__(self):
         return f"Club: {self.name}"
     
+# Precedence of membership roles, lowest to highest
+ROLE_RANKS = {
+    'member': 1,
+    'organizer': 2,
+    'admin': 3,
+}
+
+class MembershipQuerySet(models.QuerySet):
+    def at_least(self, role):
+        ''' Memberships whose role ranks at or above role, as one indexed comparison '''
+        return self.filter(rank__gte=ROLE_RANKS[role])
+
 # Membership model - defines how users and clubs are linked
 class Membership(models.Model):
     # A membership is tied to one user and club at a time
@@ -27,15 +53,34 @@ class Membership(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="member_user")
     club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="member_club")
     # Roles each user can have in a club
-    role = models.CharField(max_length=50, choices=[
+    role = models.CharField(max_length=50, default='member', choices=[
         ('member', 'Member'),
         ('organizer', 'Organizer'),
         ('admin', 'Admin'),
     ])
+    # ROLE_RANKS value of the role, kept by the database
+    rank = models.GeneratedField(
+        expression=models.Case(
+            *(models.When(role=role, then=models.Value(value)) for role, value in ROLE_RANKS.items()),
+            default=models.Value(0),
+        ),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+    )
     date_joined = models.DateField(auto_now_add=True)
 
+    objects = MembershipQuerySet.as_manager()
+
     class Meta:
-        unique_together = ('user', 'club')
+        # The one membership store (networking.ClubMembership is a proxy of it).
+        # Both indexes carry the role and its rank so membership and role
+        # checks, a user's clubs and a club's members are all index-only scans
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'club'], include=['role', 'rank'], name='membership_user_club'),
+        ]
+        indexes = [
+            models.Index(fields=['club', 'user'], include=['role', 'rank'], name='membership_club_user_idx'),
+        ]
 
 class MergeRequest(models.Model):
     club_1 = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="club_a_merge")
@@ -67,22 +112,25 @@ class MergeRequest(models.Model):
     def ready(self):
         return self.accepted_1 and self.accepted_2
     
-    def perform_merge(self):
-        if self.created:
-            return self.merged_club
+    def perform_merge(self, calendars=False, documents=False):
+        ''' Create the merged club and fill it from both clubs in one transaction.
+        Optionally copy calendars and document managers as well '''
+        from .merging import merge_clubs
 
-        name = f"{self.club_1.name} x {self.club_2.name}"
-        desc = f"Partnership of {self.club_1.name} and {self.club_2.name}"
-        new_club = Club.objects.create(name=name, description=desc)
+        with transaction.atomic():
+            # Lock the request so two simultaneous accepts cannot both merge
+            locked = MergeRequest.objects.select_for_update().get(pk=self.pk)
+            if locked.created:
+                return locked.merged_club
 
-        members_1 = Membership.objects.filter(club=self.club_1)
-        members_2 = Membership.objects.filter(club=self.club_2)
+            name = f"{self.club_1.name} x {self.club_2.name}"
+            desc = f"Partnership of {self.club_1.name} and {self.club_2.name}"
+            new_club = Club.objects.create(name=name, description=desc)
 
-        for m in list(members_1) + list(members_2):
-            Membership.objects.get_or_create(user=m.user, club=new_club, defaults={"role": m.role})
+            merge_clubs([self.club_1, self.club_2], new_club, calendars=calendars, documents=documents)
 
-        self.merged_club = new_club
-        self.created = True
-        self.save()
+            self.merged_club = new_club
+            self.created = True
+            self.save()
 
-        return new_club
\ No newline at end of file
+        return new_club
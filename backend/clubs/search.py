@@ -0,0 +1,29 @@
+from django.contrib.postgres.search import SearchVector
+from django.db.models import F, Func, TextField, Value
+from .models import Club
+
+# Fields that feed the search vector; saving any of them refreshes it
+SEARCH_FIELDS = {"name", "summary", "description", "tags"}
+
+
+def club_search_vector():
+    '''
+    Weighted tsvector over a club: name ranks highest, then tags and summary,
+    then the full description.
+    '''
+    tags = Func(F("tags"), Value(" "), function="array_to_string", output_field=TextField())
+    return (
+        SearchVector("name", weight="A", config="english")
+        + SearchVector(tags, weight="B", config="english")
+        + SearchVector("summary", weight="B", config="english")
+        + SearchVector("description", weight="C", config="english")
+    )
+
+
+def refresh_search_vectors(club_ids=None):
+    '''
+    Recompute the stored search vector in one UPDATE, for the given clubs or
+    for every club when club_ids is None.
+    '''
+    clubs = Club.objects.all() if club_ids is None else Club.objects.filter(id__in=club_ids)
+    return clubs.update(search_vector=club_search_vector())
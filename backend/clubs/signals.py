@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from networking.models import ClubMembership
+from users.permissions import invalidate_club_roles
+from .models import Club, Membership
+from .search import SEARCH_FIELDS, refresh_search_vectors
+
+
+@receiver(post_save, sender=Club)
+def refresh_club_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the club's search vector in step with its text, one row at a time.
+    Skipped when a save only touches fields that are not searched.
+    """
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    refresh_search_vectors([instance.id])
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+@receiver(post_save, sender=ClubMembership)
+@receiver(post_delete, sender=ClubMembership)
+def membership_changed(sender, instance, **kwargs):
+    """
+    Drop the member's cached club roles. Proxy saves are sent with the proxy
+    as sender, so both are listened to.
+    """
+    invalidate_club_roles([instance.user_id])
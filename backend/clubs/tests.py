@@ -1,7 +1,9 @@
 from django.test import TestCase, Client
 from users.models import User
 from clubs.models import Club, Membership, MergeRequest
-from calendar_app.models import Calendar, Meeting
+from clubs.deletion import delete_club_graph
+from calendar_app.models import Calendar, Meeting, DeletedMeeting, RecurrenceRule, RecurrenceException
+from calendar_app.mirrors import sync_mirror_calendars
 from document.models import DocumentManager, Document
 from io import BytesIO
 from PIL import Image
@@ -134,6 +136,78 @@ class ClubCRUDTests(BaseClubTestCase):
         self.assertEqual(clubs[0]['name'], 'Club 1')
         self.assertEqual(clubs[1]['name'], 'Club 2')
 
+    def test_club_directory_tag_filters(self):
+        """Test directory filtering on all or any of the requested tags"""
+        Club.objects.create(name='Chess', description='d', tags=['games', 'strategy'])
+        Club.objects.create(name='Go', description='d', tags=['games'])
+        Club.objects.create(name='Robotics', description='d', tags=['engineering'])
+        self.client.login(username='testuser1', password='password123')
+
+        response = self.client.get('/clubs/directory/', {'tags': 'games,strategy'})
+        self.assertEqual([c['name'] for c in response.json()['clubs']], ['Chess'])
+
+        response = self.client.get('/clubs/directory/', {'tags': 'strategy,engineering', 'match': 'any'})
+        self.assertEqual([c['name'] for c in response.json()['clubs']], ['Chess', 'Robotics'])
+        self.assertEqual(set(response.json()['clubs'][0]), {'id', 'name', 'tags'})
+
+    def test_club_directory_cursor_pagination(self):
+        """Test directory pages follow the cursor in name and recency order"""
+        for name in ['Delta', 'Alpha', 'Charlie', 'Bravo', 'Echo']:
+            Club.objects.create(name=name, description='d')
+        self.client.login(username='testuser1', password='password123')
+
+        names, cursor = [], None
+        while True:
+            params = {'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            body = self.client.get('/clubs/directory/', params).json()
+            names += [c['name'] for c in body['clubs']]
+            cursor = body['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(names, ['Alpha', 'Bravo', 'Charlie', 'Delta', 'Echo'])
+
+        body = self.client.get('/clubs/directory/', {'order': 'recent', 'limit': 3}).json()
+        self.assertEqual([c['name'] for c in body['clubs']], ['Echo', 'Bravo', 'Charlie'])
+        body = self.client.get('/clubs/directory/', {'order': 'recent', 'cursor': body['next_cursor']}).json()
+        self.assertEqual([c['name'] for c in body['clubs']], ['Alpha', 'Delta'])
+        self.assertIsNone(body['next_cursor'])
+
+    def test_club_directory_bad_params(self):
+        """Test directory rejects malformed cursors and limits"""
+        self.client.login(username='testuser1', password='password123')
+        self.assertEqual(self.client.get('/clubs/directory/', {'cursor': 'garbage'}).status_code, 400)
+        self.assertEqual(self.client.get('/clubs/directory/', {'limit': 'ten'}).status_code, 400)
+        self.assertEqual(self.client.get('/clubs/directory/', {'order': 'size'}).status_code, 400)
+
+    def test_search_clubs_ranks_and_highlights(self):
+        """Test full-text search puts name matches first and highlights snippets"""
+        Club.objects.create(name='Film Society', description='We watch classic cinema every week')
+        Club.objects.create(name='Chess Club', description='Casual games, sometimes a chess film night')
+        Club.objects.create(name='Robotics', description='Build robots')
+        self.client.login(username='testuser1', password='password123')
+
+        response = self.client.get('/clubs/search/', {'q': 'film'})
+
+        self.assertEqual(response.status_code, 200)
+        clubs = response.json()['clubs']
+        self.assertEqual([c['name'] for c in clubs], ['Film Society', 'Chess Club'])
+        self.assertIn('<mark>film</mark>', clubs[1]['snippet'])
+
+    def test_search_clubs_follows_updates(self):
+        """Test the search vector is refreshed when a club is saved"""
+        club = Club.objects.create(name='Hiking', description='Trails')
+        self.client.login(username='testuser1', password='password123')
+        self.assertEqual(self.client.get('/clubs/search/', {'q': 'kayak'}).json()['clubs'], [])
+
+        club.tags = ['kayaking']
+        club.save()
+
+        clubs = self.client.get('/clubs/search/', {'q': 'kayak'}).json()['clubs']
+        self.assertEqual([c['id'] for c in clubs], [club.id])
+        self.assertEqual(self.client.get('/clubs/search/').status_code, 400)
+
     def test_view_club_by_id(self):
         """Test viewing single club by ID"""
         club = Club.objects.create(name='Test Club', description='Test Description')
@@ -241,6 +315,39 @@ class ClubCRUDTests(BaseClubTestCase):
         # Verify club was deleted
         self.assertFalse(Club.objects.filter(id=club_id).exists())
 
+    def test_delete_club_removes_related_data(self):
+        """Test deleting a club removes its calendars, mirrors, documents and memberships"""
+        club = Club.objects.create(name='Test Club', description='Test Description')
+        other = Club.objects.create(name='Other Club', description='Other')
+        Membership.objects.create(user=self.user1, club=club, role='organizer')
+        Membership.objects.create(user=self.user2, club=club, role='member')
+        sync_mirror_calendars(club)
+        calendar = Calendar.objects.create(name='Events', club=club)
+        Meeting.objects.create(calendar=calendar, date=datetime(2025, 3, 1, 10, 0), description='Kickoff')
+        manager = DocumentManager.objects.create(name='Docs', club=club)
+        Document.objects.create(title='Minutes', file='club_1/documents/minutes.pdf', document_manager=manager)
+        MergeRequest.objects.create(club_1=club, club_2=other, accepted_1=True)
+        personal = Calendar.objects.create(name='Mine', user=self.user2)
+
+        deleted = delete_club_graph(club)
+
+        self.assertEqual(deleted['calendar_app.Calendar'], 3)
+        self.assertFalse(Club.objects.filter(id=club.id).exists())
+        self.assertFalse(Calendar.objects.filter(source_club_id=club.id).exists())
+        self.assertFalse(Meeting.objects.exists())
+        self.assertFalse(Document.objects.exists())
+        self.assertFalse(Membership.objects.filter(club_id=club.id).exists())
+        self.assertFalse(MergeRequest.objects.exists())
+        self.assertTrue(Club.objects.filter(id=other.id).exists())
+        self.assertTrue(Calendar.objects.filter(id=personal.id).exists())
+
+    def test_delete_club_graph_covers_every_reference(self):
+        """Tables deleted without the collector have no foreign keys the deletion misses"""
+        handled = {Calendar, Meeting, DeletedMeeting, RecurrenceRule, RecurrenceException}
+        for model in (Calendar, Meeting, RecurrenceRule, Membership):
+            for relation in model._meta.related_objects:
+                self.assertIn(relation.related_model, handled, f"{relation.related_model} points at {model}")
+
     def test_delete_club_requires_organizer(self):
         """Test delete club requires organizer role"""
         club = Club.objects.create(name='Test Club', description='Test Description')
@@ -576,3 +683,42 @@ class MergeRequestTests(BaseClubTestCase):
 
         # Verify merge request was deleted
         self.assertFalse(MergeRequest.objects.filter(id=merge_req.id).exists())
+
+    def test_perform_merge_keeps_highest_role(self):
+        """Test merged club gets each member once with their highest role"""
+        club1 = Club.objects.create(name='Club 1', description='Description 1')
+        club2 = Club.objects.create(name='Club 2', description='Description 2')
+        Membership.objects.create(user=self.user1, club=club1, role='organizer')
+        Membership.objects.create(user=self.user1, club=club2, role='member')
+        Membership.objects.create(user=self.user2, club=club1, role='member')
+        Membership.objects.create(user=self.user3, club=club2, role='admin')
+        merge_req = MergeRequest.objects.create(club_1=club1, club_2=club2, accepted_1=True, accepted_2=True)
+
+        merged = merge_req.perform_merge()
+
+        roles = dict(Membership.objects.filter(club=merged).values_list('user__username', 'role'))
+        self.assertEqual(roles, {'testuser1': 'organizer', 'testuser2': 'member', 'testuser3': 'admin'})
+        self.assertEqual(Calendar.objects.filter(source_club=merged, is_club_mirror=True).count(), 3)
+        # Merging again returns the same club
+        self.assertEqual(merge_req.perform_merge(), merged)
+        self.assertEqual(Club.objects.filter(name='Club 1 x Club 2').count(), 1)
+
+    def test_perform_merge_copies_calendars_and_documents(self):
+        """Test merge optionally copies calendars, meetings and document managers"""
+        club1 = Club.objects.create(name='Club 1', description='Description 1')
+        club2 = Club.objects.create(name='Club 2', description='Description 2')
+        calendar = Calendar.objects.create(name='Events', club=club1)
+        Meeting.objects.create(calendar=calendar, date=datetime(2025, 3, 1, 10, 0), description='Kickoff')
+        manager = DocumentManager.objects.create(name='Docs', club=club2)
+        Document.objects.create(title='Minutes', file='club_2/documents/minutes.pdf', document_manager=manager)
+        merge_req = MergeRequest.objects.create(club_1=club1, club_2=club2, accepted_1=True, accepted_2=True)
+
+        merged = merge_req.perform_merge(calendars=True, documents=True)
+
+        merged_calendar = Calendar.objects.get(club=merged)
+        self.assertEqual(merged_calendar.name, 'Club 1: Events')
+        self.assertEqual(merged_calendar.meetings.get().description, 'Kickoff')
+        merged_manager = DocumentManager.objects.get(club=merged)
+        self.assertEqual(merged_manager.documents.get().file.name, 'club_2/documents/minutes.pdf')
+        # Originals are untouched
+        self.assertEqual(calendar.meetings.count(), 1)
@@ -5,6 +5,8 @@ urlpatterns = [
     # Club
     path("create/", views.create_club, name="create-club"),
     path("get/", views.view_clubs, name="get-club"),
+    path("directory/", views.club_directory, name="club-directory"),
+    path("search/", views.search_clubs, name="search-clubs"),
     path("update/", views.update_club, name="update-club"),
     path("delete/", views.delete_club, name="delete-club"),
 
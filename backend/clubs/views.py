@@ -1,9 +1,10 @@
 from .models import Club, Membership, MergeRequest
-from calendar_app.models import Calendar, Meeting
+from .deletion import delete_club_graph
+from calendar_app.mirrors import sync_mirror_calendars
 from users.models import User
-from document.models import DocumentManager, Document
 from django.http import JsonResponse
 from users.views import is_member
+from users.permissions import club_role_required, role_in
 from django.utils.dateparse import parse_datetime
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
@@ -11,11 +12,36 @@ from datetime import datetime
 from django.views.decorators.http import require_POST
 from urllib.parse import parse_qs
 from django.utils.text import slugify
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Concat
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+import base64
+import binascii
 import hashlib
 import json
 
 
+DIRECTORY_PAGE_SIZE = 50
+DIRECTORY_MAX_PAGE_SIZE = 200
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+''' INTERNAL LOGIC -- NOT CALLED BY URL '''
+def encode_cursor(values):
+    ''' Opaque, URL-safe pagination cursor from the sort key of the last row '''
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor):
+    ''' Inverse of encode_cursor; raises ValueError on garbage '''
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (json.JSONDecodeError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
+
 ''' CLUB CRUD '''
 
 @require_POST
@@ -73,6 +99,93 @@ def view_clubs(request):
         }
     return JsonResponse(data)
 
+@login_required
+def club_directory(request):
+    '''Browse clubs a page at a time: id, name and tags only, with tag filters'''
+    order = request.GET.get("order", "name")
+    match = request.GET.get("match", "all")
+    tags = [t.strip() for t in request.GET.get("tags", "").split(",") if t.strip()]
+    cursor = request.GET.get("cursor")
+
+    if order not in ("name", "recent"):
+        return JsonResponse({"error": "order must be name or recent"}, status=400)
+    if match not in ("all", "any"):
+        return JsonResponse({"error": "match must be all or any"}, status=400)
+    try:
+        limit = min(int(request.GET.get("limit", DIRECTORY_PAGE_SIZE)), DIRECTORY_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+    if limit < 1:
+        return JsonResponse({"error": "limit must be positive"}, status=400)
+
+    clubs = Club.objects.only("id", "name", "tags")
+
+    # Both lookups are served by the GIN index on tags
+    if tags:
+        clubs = clubs.filter(tags__contains=tags) if match == "all" else clubs.filter(tags__overlap=tags)
+
+    # Keyset pagination: continue after the last club of the previous page
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+            if order == "name":
+                clubs = clubs.filter(models.Q(name__gt=after[0]) | models.Q(name=after[0], id__gt=after[1]))
+            else:
+                clubs = clubs.filter(id__lt=after[0])
+        except (ValueError, TypeError, IndexError):
+            return JsonResponse({"error": "invalid cursor"}, status=400)
+
+    # No created timestamp on clubs; ids increase, so newest first is -id
+    clubs = clubs.order_by("name", "id") if order == "name" else clubs.order_by("-id")
+
+    page = list(clubs[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = page[-1]
+        next_cursor = encode_cursor([last.name, last.id] if order == "name" else [last.id])
+
+    return JsonResponse({
+        "clubs": [{"id": c.id, "name": c.name, "tags": c.tags} for c in page],
+        "next_cursor": next_cursor,
+    })
+
+@login_required
+def search_clubs(request):
+    '''Full-text club search, best matches first with highlighted snippets'''
+    text = request.GET.get("q", "").strip()
+    if not text:
+        return JsonResponse({"error": "Missing search query"}, status=400)
+    try:
+        limit = min(int(request.GET.get("limit", SEARCH_PAGE_SIZE)), SEARCH_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "limit must be an integer"}, status=400)
+    if limit < 1:
+        return JsonResponse({"error": "limit must be positive"}, status=400)
+
+    query = SearchQuery(text, search_type="websearch", config="english")
+
+    # Matching uses the GIN index on the stored vector; headlines are only
+    # built for the rows that make the page
+    clubs = (
+        Club.objects.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "id")
+        .annotate(snippet=SearchHeadline(
+            Concat("summary", Value(" "), "description", output_field=TextField()),
+            query,
+            config="english",
+            start_sel="<mark>",
+            stop_sel="</mark>",
+            max_fragments=2,
+        ))
+        .values("id", "name", "tags", "rank", "snippet")[:limit]
+    )
+
+    return JsonResponse({"clubs": list(clubs)})
+
 @login_required
 @require_POST
 def update_club(request):
@@ -142,6 +255,10 @@ def update_club(request):
                 club.lastMeetingDate = None
 
         club.save()
+
+        # Carry a new name over to the members' mirror calendars
+        if club_name:
+            sync_mirror_calendars(club)
         return JsonResponse({"status": True})
 
     except json.JSONDecodeError as json_error:
@@ -165,30 +282,7 @@ def delete_club(request):
     if not is_member(request.user, club=club, role='organizer'):
         return JsonResponse({"error": "Permissions"}, status=403)
     
-    # Memberships
-    memberships = Membership.objects.filter(club=club)
-    for member in memberships:
-        member.delete()
-
-    # Calendars
-    calendars = Calendar.objects.filter(club=club)
-    for cal in calendars:
-        # Meetings
-        meetings = Meeting.objects.filter(calendar=cal)
-        for meet in meetings:
-            meet.delete()
-        cal.delete()
-
-    # Document Managers
-    document_managers = DocumentManager.objects.filter(club=club)
-    for manager in document_managers:
-        # Documents
-        documents = Document.objects.filter(manager=manager)
-        for doc in documents:
-            doc.delete()
-        manager.delete()
-
-    club.delete()
+    delete_club_graph(club)
     return JsonResponse({"status": True})
 
 ''' MEMBERSHIP CRUD '''
@@ -208,37 +302,17 @@ def join_club(request):
         return JsonResponse({'error': "already a member of this club"}, status=409)
 
 
-    # Create membership
-    Membership.objects.create(
-        user = request.user,
-        club=club,
-        role='member'
-    )
-
-    # Create mirror calendar for user
-    mirror_calendar = Calendar.objects.create(
-        name=club.name,
-        user=request.user,
-        is_club_mirror=True,
-        source_club=club
-    )
+    with transaction.atomic():
+        # Create membership
+        Membership.objects.create(
+            user = request.user,
+            club=club,
+            role='member'
+        )
 
-    # Copy all existing club meetings to user's mirror calendar
-    club_calendars = Calendar.objects.filter(club=club)
-    for club_calendar in club_calendars:
-        meetings = Meeting.objects.filter(calendar=club_calendar)
-        for meeting in meetings:
-            # Prepend original calendar name to description
-            original_description = meeting.description or ""
-            mirror_description = f"[{club_calendar.name}] {original_description}"
-
-            Meeting.objects.create(
-                calendar=mirror_calendar,
-                date=meeting.date,
-                description=mirror_description,
-                is_mirror=True,
-                source_meeting=meeting
-            )
+        # Create mirror calendar for user; its meetings are resolved from the
+        # club calendars at read time, so nothing is copied here
+        sync_mirror_calendars(club, user_ids=[request.user.id])
 
     return JsonResponse({"status": True})
   
@@ -359,21 +433,19 @@ def delete_membership(request):
             except User.DoesNotExist:
                 return JsonResponse({"error": "user not found"}, status=404)
             
-            # Recipient is member
-            if is_member(user=user, club=club, role='member'):
+            # Recipient is a plain member; role checks rank upwards, so
+            # compare the role itself
+            recipient_role = role_in(user, club)
+            if recipient_role == 'member':
                 member = Membership.objects.get(user=user, club=club, role='member')
                 member.delete()
 
                 # Delete user's mirror calendar for this club
-                Calendar.objects.filter(
-                    user=user,
-                    is_club_mirror=True,
-                    source_club=club
-                ).delete()
+                sync_mirror_calendars(club, user_ids=[user.id])
 
                 return JsonResponse({"status": True})
 
-            elif is_member(user=user, club=club, role='organizer'):
+            elif recipient_role is not None:
                 return JsonResponse({"error": "cannot remove fellow organizer"}, status=403)
             
             else:
@@ -389,11 +461,7 @@ def delete_membership(request):
             member.delete()
 
             # Delete user's mirror calendar for this club
-            Calendar.objects.filter(
-                user=request.user,
-                is_club_mirror=True,
-                source_club=club
-            ).delete()
+            sync_mirror_calendars(club, user_ids=[request.user.id])
 
             return JsonResponse({"status": True})
 
@@ -499,19 +567,9 @@ def view_merge_request(request):
 
 @login_required
 @require_POST
+@club_role_required("organizer")
 def update_merge_request(request):
-    club_id = request.POST.get("club_id")
-
-    if not club_id:
-        return JsonResponse({"error": "missing required fields"}, status=400)
-    
-    try:
-        club = Club.objects.get(id=club_id)
-    except Club.DoesNotExist:
-        return JsonResponse({"error": "club not found"}, status=404)
-    
-    if not is_member(user=request.user, club=club, role="organizer"):
-        return JsonResponse({"error": "you are not an organizer of this club"}, status=403)
+    club = request.club
 
     merge_req = MergeRequest.objects.filter(
         models.Q(club_1=club) | models.Q(club_2=club)
@@ -524,7 +582,10 @@ def update_merge_request(request):
 
     if ready:
         if not merge_req.created:
-            merged_club = merge_req.perform_merge()
+            merged_club = merge_req.perform_merge(
+                calendars=request.POST.get("merge_calendars") == "true",
+                documents=request.POST.get("merge_documents") == "true",
+            )
             return JsonResponse({"status": True, "merged_id": merged_club.id})
         else:
             return JsonResponse({"status": True, "merged_id": merge_req.merged_club.id})
@@ -534,19 +595,9 @@ def update_merge_request(request):
 
 @login_required
 @require_POST
+@club_role_required("organizer")
 def delete_merge_request(request):
-    club_id = request.POST.get("club_id")
-
-    if not club_id:
-        return JsonResponse({"error": "missing required fields"}, status=400)
-    
-    try:
-        club = Club.objects.get(id=club_id)
-    except Club.DoesNotExist:
-        return JsonResponse({"error": "club not found"}, status=404)
-    
-    if not is_member(user=request.user, club=club, role="organizer"):
-        return JsonResponse({"error": "you are not an organizer of this club"}, status=403)
+    club = request.club
 
     merge_req = MergeRequest.objects.filter(
         models.Q(club_1=club) | models.Q(club_2=club)
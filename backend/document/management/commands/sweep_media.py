@@ -0,0 +1,74 @@
+"""
+Django management command to delete uploaded files no longer referenced by any row
+Usage: python manage.py sweep_media [--dry-run] [--min-age MINUTES]
+
+Club deletion removes rows only; run this periodically (e.g. from cron) to
+reclaim the space taken by their documents and pictures.
+"""
+import re
+from datetime import timedelta
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from clubs.models import Club
+from document.models import Document
+
+# Top-level media folders that hold document uploads (see upload_document)
+DOCUMENT_ROOT = re.compile(r"^(club|user)_\d+$")
+CLUB_PICTURES = "clubs"
+
+
+class Command(BaseCommand):
+    help = 'Delete uploaded documents and club pictures that no database row points at'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the files that would be deleted without deleting them',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=60,
+            help='Skip files modified in the last N minutes, so uploads in flight are kept (default: 60)',
+        )
+
+    def walk(self, path):
+        ''' Yield every file below a storage directory '''
+        dirs, files = default_storage.listdir(path)
+        for name in files:
+            yield f"{path}/{name}"
+        for name in dirs:
+            yield from self.walk(f"{path}/{name}")
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        cutoff = timezone.now() - timedelta(minutes=options['min_age'])
+
+        # One query per table for everything still referenced
+        referenced = set(Document.objects.values_list('file', flat=True))
+        referenced.update(Club.objects.exclude(display_picture='').values_list('display_picture', flat=True))
+
+        try:
+            top_dirs, _ = default_storage.listdir('')
+        except FileNotFoundError:
+            self.stdout.write(self.style.WARNING('Media directory does not exist. Nothing to sweep.'))
+            return
+
+        roots = [d for d in top_dirs if DOCUMENT_ROOT.match(d) or d == CLUB_PICTURES]
+        removed = 0
+        for root in roots:
+            for path in self.walk(root):
+                if path in referenced:
+                    continue
+                if default_storage.get_modified_time(path) > cutoff:
+                    continue
+                if dry_run:
+                    self.stdout.write(f'Would delete {path}')
+                else:
+                    default_storage.delete(path)
+                removed += 1
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {removed} unreferenced files'))
@@ -12,6 +12,7 @@ from datetime import datetime
 import uuid
 from django.contrib.auth.decorators import login_required
 from users.views import is_member
+from users.permissions import club_with_role, rank_at_least
 from .models import DocumentManager, Document
 
 @require_POST
@@ -26,11 +27,11 @@ def create_manager(request):
     # Club document manager
     if club_id:
         try:
-            club = Club.objects.get(id=club_id)
+            club, role = club_with_role(request.user, club_id)
         except Club.DoesNotExist:
             return JsonResponse({"error" : "Club not found"}, status=404)
         
-        if not is_member(user=request.user, club=club, role="organizer"):
+        if not rank_at_least(role, "organizer"):
             return JsonResponse({"error": "you are not an organizer of this club"}, status=403)
         
         document_manager = DocumentManager.objects.create(name=name, user=None, club=club)
@@ -47,11 +48,11 @@ def get_managers(request):
     
     if club_id:
         try:
-            club = Club.objects.get(id=club_id)
+            club, role = club_with_role(request.user, club_id)
         except Club.DoesNotExist:
             return JsonResponse({"error" : "Club not found"}, status=409)
         
-        if not is_member(user=request.user, club=club):
+        if role is None:
             return JsonResponse({"error": "you are not a member of the associated club"}, status=403)
         
         managers = []
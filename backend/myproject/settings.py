@@ -51,6 +51,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # Trigram lookups for people search
     'rest_framework',       # For API endpoints
     'corsheaders',          # To allow React frontend requests
     'clubs',
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserConnection, NetworkProfile, ClubMembership
+from .models import UserConnection, NetworkProfile, ClubMembership, ClubNeighbor, NetworkCounters, InterestNeighbor
 
 
 @admin.register(UserConnection)
@@ -17,6 +17,24 @@ class NetworkProfileAdmin(admin.ModelAdmin):
 
 @admin.register(ClubMembership)
 class ClubMembershipAdmin(admin.ModelAdmin):
-    list_display = ['user', 'club', 'role', 'joined_at']
-    list_filter = ['role', 'joined_at']
+    list_display = ['user', 'club', 'role', 'date_joined']
+    list_filter = ['role', 'date_joined']
     search_fields = ['user__username', 'club__name']
+
+
+@admin.register(ClubNeighbor)
+class ClubNeighborAdmin(admin.ModelAdmin):
+    list_display = ['user', 'neighbor', 'shared_clubs', 'jaccard', 'computed_at']
+    search_fields = ['user__username', 'neighbor__username']
+
+
+@admin.register(NetworkCounters)
+class NetworkCountersAdmin(admin.ModelAdmin):
+    list_display = ['user', 'total_connections', 'pending_sent', 'pending_received', 'club_memberships', 'updated_at']
+    search_fields = ['user__username']
+
+
+@admin.register(InterestNeighbor)
+class InterestNeighborAdmin(admin.ModelAdmin):
+    list_display = ['user', 'neighbor', 'similarity', 'computed_at']
+    search_fields = ['user__username', 'neighbor__username']
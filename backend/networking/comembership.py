@@ -0,0 +1,105 @@
+"""
+Sparse user x club co-membership engine.
+
+Builds the incidence matrix A (users x clubs) from club memberships,
+computes co-membership counts A.A^T a batch of users at a time, and keeps
+each user's top-k neighbours by Jaccard similarity in ClubNeighbor.
+"""
+import numpy as np
+from scipy import sparse
+from django.db import transaction
+from django.utils import timezone
+from clubs.models import Membership
+from .models import ClubNeighbor
+
+DEFAULT_TOP_K = 20
+# Users per A[batch].A^T product; bounds memory when big clubs make rows dense
+DEFAULT_BATCH_SIZE = 2000
+INSERT_BATCH_SIZE = 1000
+
+
+def membership_pairs():
+    ''' (user_id, club_id) pairs of every membership, as an n x 2 array '''
+    pairs = Membership.objects.order_by().values_list("user_id", "club_id")
+    return np.array(list(pairs), dtype=np.int64).reshape(-1, 2)
+
+
+def incidence_matrix(pairs):
+    '''
+    CSR matrix with a 1 where a user belongs to a club, plus the user ids of
+    its rows and the club ids of its columns (both ascending).
+    '''
+    user_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    club_ids, cols = np.unique(pairs[:, 1], return_inverse=True)
+    data = np.ones(len(pairs), dtype=np.int32)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(len(user_ids), len(club_ids)))
+    return matrix, user_ids, club_ids
+
+
+def top_k_per_row(rows, cols, scores, top_k):
+    '''
+    Indices of the top_k entries of every row of a sparse (rows, cols) listing,
+    grouped by row and best first: ordered by each array in scores (highest
+    first, earlier arrays take precedence), then by column.
+    '''
+    order = np.lexsort((cols, *[-score for score in reversed(scores)], rows))
+    rows = rows[order]
+
+    # Rank of every entry inside its row's group
+    group_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(rows)])
+    rank = np.arange(len(rows)) - np.repeat(group_starts, group_sizes)
+    return order[rank < top_k]
+
+
+def top_neighbors(matrix, top_k=DEFAULT_TOP_K, batch_size=DEFAULT_BATCH_SIZE):
+    '''
+    Yield (rows, neighbors, shared, jaccard) arrays, one batch of users at a
+    time, holding each user's top_k other users by Jaccard similarity (ties by
+    shared clubs, then row). Rows and neighbors are matrix row indices.
+    '''
+    degree = np.asarray(matrix.sum(axis=1)).ravel()
+    transposed = matrix.T.tocsr()
+
+    for start in range(0, matrix.shape[0], batch_size):
+        product = (matrix[start:start + batch_size] @ transposed).tocoo()
+        rows = product.row + start
+        not_self = rows != product.col
+        rows, cols, shared = rows[not_self], product.col[not_self], product.data[not_self]
+        jaccard = shared / (degree[rows] + degree[cols] - shared)
+
+        best = top_k_per_row(rows, cols, [jaccard, shared], top_k)
+        yield rows[best], cols[best], shared[best], jaccard[best]
+
+
+def rebuild_club_neighbors(top_k=DEFAULT_TOP_K, batch_size=DEFAULT_BATCH_SIZE):
+    '''
+    Replace the ClubNeighbor table with freshly computed top-k neighbours for
+    every user. Returns the number of rows written.
+    '''
+    pairs = membership_pairs()
+    computed_at = timezone.now()
+    written = 0
+
+    with transaction.atomic():
+        ClubNeighbor.objects.all().delete()
+        if not len(pairs):
+            return 0
+
+        matrix, user_ids, _ = incidence_matrix(pairs)
+        for rows, cols, shared, jaccard in top_neighbors(matrix, top_k, batch_size):
+            ClubNeighbor.objects.bulk_create([
+                ClubNeighbor(
+                    user_id=user_id,
+                    neighbor_id=neighbor_id,
+                    shared_clubs=count,
+                    jaccard=score,
+                    computed_at=computed_at,
+                )
+                for user_id, neighbor_id, count, score in zip(
+                    user_ids[rows].tolist(), user_ids[cols].tolist(), shared.tolist(), jaccard.tolist()
+                )
+            ], batch_size=INSERT_BATCH_SIZE)
+            written += len(rows)
+
+    return written
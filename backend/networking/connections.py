@@ -0,0 +1,53 @@
+from django.db.models import Count, Q
+from .models import UserConnection
+
+CONNECTIONS_PAGE_SIZE = 50
+CONNECTIONS_MAX_PAGE_SIZE = 200
+
+# Fields the connections listing reads, for both ends of the connection
+PROFILE_FIELDS = [
+    f"{end}__{field}"
+    for end in ("from_user", "to_user")
+    for field in ("id", "username", "first_name", "last_name", "email", "network_profile__bio")
+]
+
+
+def connection_page(user, status=None, after=None, limit=CONNECTIONS_PAGE_SIZE):
+    '''
+    Up to `limit` of user's connections, newest first by (created_at, id),
+    starting after the (created_at, id) key `after`. Returns (connections,
+    has_more).
+
+    Sent and received connections are read as two index range scans, each
+    stopping after limit + 1 rows, and merged; then only the page's rows are
+    loaded with both users and profiles joined in.
+    '''
+    keys = []
+    for direction in ("from_user", "to_user"):
+        side = UserConnection.objects.filter(**{direction: user})
+        if status:
+            side = side.filter(status=status)
+        if after:
+            created_at, connection_id = after
+            side = side.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=connection_id))
+        keys.append(side.order_by("-created_at", "-id").values_list("created_at", "id")[:limit + 1])
+
+    page_keys = list(keys[0].union(keys[1], all=True).order_by("-created_at", "-id")[:limit + 1])
+    has_more = len(page_keys) > limit
+    page_ids = [connection_id for _, connection_id in page_keys[:limit]]
+
+    connections = (
+        UserConnection.objects.filter(id__in=page_ids)
+        .select_related("from_user__network_profile", "to_user__network_profile")
+        .only("id", "from_user", "to_user", "status", "message", "created_at", *PROFILE_FIELDS)
+    )
+    by_id = {connection.id: connection for connection in connections}
+    return [by_id[connection_id] for connection_id in page_ids if connection_id in by_id], has_more
+
+
+def status_counts(user):
+    ''' {status: number of user's connections with it}, in one conditional aggregate '''
+    return UserConnection.objects.involving(user).order_by().aggregate(**{
+        status: Count("id", filter=Q(status=status))
+        for status, _ in UserConnection.STATUS_CHOICES
+    })
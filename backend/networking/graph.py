@@ -0,0 +1,89 @@
+"""
+Graph queries over accepted UserConnection edges.
+
+Each connection carries a generated `endpoints` array of both user ids, so
+involving()/involving_any() find a user's edges whichever way they were sent
+with one GIN index probe. Searches expand a whole BFS level per query, from
+whichever side of a bidirectional search has the smaller frontier, and stop
+at MAX_DEGREE, so the work stays bounded however large the network grows.
+"""
+from collections import defaultdict
+from .models import UserConnection
+
+MAX_DEGREE = 3
+
+
+def accepted_neighbors(user_ids):
+    ''' {user id: set of ids they are connected to} for user_ids, in one query '''
+    user_ids = set(user_ids)
+    edges = (
+        UserConnection.objects.filter(status='accepted')
+        .involving_any(user_ids)
+        .order_by()
+        .values_list('from_user_id', 'to_user_id')
+    )
+    neighbors = defaultdict(set)
+    for from_id, to_id in edges:
+        if from_id in user_ids:
+            neighbors[from_id].add(to_id)
+        if to_id in user_ids:
+            neighbors[to_id].add(from_id)
+    return neighbors
+
+
+def mutual_connection_ids(user_id, other_id):
+    ''' Ids of users connected to both users '''
+    neighbors = accepted_neighbors([user_id, other_id])
+    return neighbors[user_id] & neighbors[other_id]
+
+
+def path_back(parents, node):
+    ''' Follow BFS parent links from node back to the search root '''
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    return path
+
+
+def shortest_path(source_id, target_id, max_degree=MAX_DEGREE):
+    '''
+    User ids along a shortest chain of accepted connections from source to
+    target, both included, or None if they are more than max_degree apart.
+    '''
+    if source_id == target_id:
+        return [source_id]
+
+    forward, backward = {source_id: None}, {target_id: None}
+    forward_frontier, backward_frontier = {source_id}, {target_id}
+
+    for _ in range(max_degree):
+        if not forward_frontier or not backward_frontier:
+            return None
+
+        # Grow the smaller side by one level
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        parents, frontier, other = (
+            (forward, forward_frontier, backward) if expand_forward else (backward, backward_frontier, forward)
+        )
+
+        # Sorted so ties between equally short paths resolve the same way each time
+        next_frontier = set()
+        neighbor_map = accepted_neighbors(frontier)
+        for node in sorted(neighbor_map):
+            for neighbor in sorted(neighbor_map[node]):
+                if neighbor not in parents:
+                    parents[neighbor] = node
+                    next_frontier.add(neighbor)
+
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+        meeting = next_frontier & other.keys()
+        if meeting:
+            node = min(meeting)
+            return path_back(forward, node)[::-1] + path_back(backward, node)[1:]
+
+    return None
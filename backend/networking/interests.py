@@ -0,0 +1,144 @@
+"""
+Skill and interest similarity engine.
+
+Profiles become rows of a sparse user x tag TF-IDF matrix, L2-normalized so
+that X.X^T holds cosine similarities. A full rebuild scores every user a
+batch of rows at a time and keeps each user's top-k in InterestNeighbor; a
+profile edit rescores only that user, against a bounded set of the users
+sharing the most (and rarest) tags with them.
+"""
+import numpy as np
+from scipy import sparse
+from django.db import transaction
+from django.db.models import Count, FloatField, Min, Q, Sum
+from django.db.models.functions import Cast
+from django.utils import timezone
+from .comembership import top_k_per_row, DEFAULT_TOP_K, DEFAULT_BATCH_SIZE, INSERT_BATCH_SIZE
+from .models import InterestNeighbor, NetworkProfile, Tag
+
+ProfileTag = NetworkProfile.tags.through
+
+# Users rescored against an edited profile; bounds the work done after a save
+REFRESH_CANDIDATES = 500
+
+
+def tag_links(links):
+    ''' (user_id, tag_id) pairs from a profile-tag queryset, as an n x 2 array '''
+    return np.array(list(links.values_list("networkprofile__user_id", "tag_id")), dtype=np.int64).reshape(-1, 2)
+
+
+def tfidf_matrix(links, profile_count, doc_freq=None):
+    '''
+    Row-normalized CSR TF-IDF matrix of users x tags, with the user ids of its
+    rows (ascending). Tag document frequencies come from doc_freq ({tag id:
+    profiles}) or, for a full matrix, from the links themselves.
+    '''
+    user_ids, rows = np.unique(links[:, 0], return_inverse=True)
+    tag_ids, cols = np.unique(links[:, 1], return_inverse=True)
+    if doc_freq is None:
+        df = np.bincount(cols, minlength=len(tag_ids))
+    else:
+        df = np.array([doc_freq.get(tag_id, 1) for tag_id in tag_ids.tolist()])
+
+    # Smoothed idf: tags few people list say more about a match
+    idf = np.log((1 + profile_count) / (1 + df)) + 1
+    matrix = sparse.csr_matrix((idf[cols], (rows, cols)), shape=(len(user_ids), len(tag_ids)))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return sparse.diags(1 / norms) @ matrix, user_ids
+
+
+def rebuild_interest_neighbors(top_k=DEFAULT_TOP_K, batch_size=DEFAULT_BATCH_SIZE):
+    '''
+    Replace InterestNeighbor with every user's top-k most similar users.
+    Returns the number of rows written.
+    '''
+    links = tag_links(ProfileTag.objects.all())
+    computed_at = timezone.now()
+    written = 0
+
+    with transaction.atomic():
+        InterestNeighbor.objects.all().delete()
+        if not len(links):
+            return 0
+
+        matrix, user_ids = tfidf_matrix(links, NetworkProfile.objects.count())
+        transposed = matrix.T.tocsr()
+        for start in range(0, matrix.shape[0], batch_size):
+            product = (matrix[start:start + batch_size] @ transposed).tocoo()
+            rows = product.row + start
+            not_self = rows != product.col
+            rows, cols, scores = rows[not_self], product.col[not_self], product.data[not_self]
+            best = top_k_per_row(rows, cols, [scores], top_k)
+
+            InterestNeighbor.objects.bulk_create([
+                InterestNeighbor(user_id=user_id, neighbor_id=neighbor_id, similarity=score, computed_at=computed_at)
+                for user_id, neighbor_id, score in zip(
+                    user_ids[rows[best]].tolist(), user_ids[cols[best]].tolist(), scores[best].tolist()
+                )
+            ], batch_size=INSERT_BATCH_SIZE)
+            written += len(best)
+
+    return written
+
+
+def refresh_candidates(user_id, limit=REFRESH_CANDIDATES):
+    '''
+    Profile ids of the user and of the limit users sharing the most tags with
+    them, each shared tag weighted by its rarity (1 / profiles listing it),
+    picked in SQL so the NumPy pass stays bounded however popular the tags.
+    '''
+    mine = ProfileTag.objects.filter(networkprofile__user_id=user_id)
+    overlap = (
+        ProfileTag.objects.filter(tag_id__in=mine.values("tag_id"))
+        .exclude(networkprofile__user_id=user_id)
+        .values("networkprofile_id")
+        .annotate(weight=Sum(1.0 / Cast("tag__profile_count", FloatField())))
+        .order_by("-weight", "networkprofile_id")
+        .values_list("networkprofile_id", flat=True)[:limit]
+    )
+    return set(mine.values_list("networkprofile_id", flat=True)[:1]) | set(overlap)
+
+
+def refresh_interest_neighbors(user_id, top_k=DEFAULT_TOP_K):
+    '''
+    Rescore one user after their profile changed: their own top-k is
+    recomputed among the refresh_candidates, and they are re-entered into
+    the lists of those neighbours where they now rank in the top k. Lists
+    can run over k or keep a stale entry, and a match outside the
+    candidates waits for the next full rebuild.
+    '''
+    links = tag_links(ProfileTag.objects.filter(networkprofile_id__in=refresh_candidates(user_id)))
+    computed_at = timezone.now()
+
+    with transaction.atomic():
+        InterestNeighbor.objects.filter(Q(user_id=user_id) | Q(neighbor_id=user_id)).delete()
+        if not len(links):
+            return 0
+
+        doc_freq = dict(Tag.objects.filter(id__in=set(links[:, 1].tolist())).values_list("id", "profile_count"))
+        matrix, user_ids = tfidf_matrix(links, NetworkProfile.objects.count(), doc_freq)
+        me = int(np.searchsorted(user_ids, user_id))
+        scores = (matrix @ matrix[me].T).toarray().ravel()
+        scores[me] = 0
+
+        best = np.lexsort((user_ids, -scores))[:top_k]
+        best = best[scores[best] > 0]
+        neighbors = dict(zip(user_ids[best].tolist(), scores[best].tolist()))
+
+        # Only join lists that are short of k, or where we beat the weakest entry
+        lists = (
+            InterestNeighbor.objects.filter(user_id__in=neighbors)
+            .values("user_id").annotate(size=Count("id"), weakest=Min("similarity"))
+            .values_list("user_id", "size", "weakest")
+        )
+        full = {other: weakest for other, size, weakest in lists if size >= top_k}
+        reverse = [other for other, score in neighbors.items() if other not in full or score > full[other]]
+
+        InterestNeighbor.objects.bulk_create(
+            [InterestNeighbor(user_id=user_id, neighbor_id=other, similarity=score, computed_at=computed_at)
+             for other, score in neighbors.items()]
+            + [InterestNeighbor(user_id=other, neighbor_id=user_id, similarity=neighbors[other], computed_at=computed_at)
+               for other in reverse]
+        )
+
+    return len(neighbors)
@@ -0,0 +1,28 @@
+"""
+Django management command to precompute co-membership neighbours for suggestions
+Usage: python manage.py rebuild_club_neighbors [--top-k 20] [--batch-size 2000]
+"""
+from django.core.management.base import BaseCommand
+from networking.comembership import rebuild_club_neighbors, DEFAULT_TOP_K, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the top-k club co-membership neighbours read by network suggestions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=DEFAULT_TOP_K,
+            help=f'Neighbours kept per user (default: {DEFAULT_TOP_K})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Users per sparse matrix product (default: {DEFAULT_BATCH_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_club_neighbors(top_k=options['top_k'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Stored {written} club neighbours'))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:42
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networking', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        # Creates the pg_trgm extension
+        ('users', '0002_user_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='networkprofile',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('bio'), name='gin_trgm_ops'), name='netprofile_bio_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='networkprofile',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('skills'), name='gin_trgm_ops'), name='netprofile_skills_trgm'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networking', '0002_profile_search_trigram_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClubNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shared_clubs', models.PositiveIntegerField()),
+                ('jaccard', models.FloatField(help_text='Shared clubs over clubs either user belongs to')),
+                ('computed_at', models.DateTimeField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='club_neighbors', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-jaccard'], name='clubneighbor_user_rank_idx')],
+                'unique_together': {('user', 'neighbor')},
+            },
+        ),
+    ]
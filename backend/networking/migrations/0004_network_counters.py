@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networking', '0003_club_neighbors'),
+        ('users', '0002_user_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetworkCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='network_counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_connections', models.PositiveIntegerField(default=0)),
+                ('pending_sent', models.PositiveIntegerField(default=0)),
+                ('pending_received', models.PositiveIntegerField(default=0)),
+                ('club_memberships', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Network Counters',
+            },
+        ),
+    ]
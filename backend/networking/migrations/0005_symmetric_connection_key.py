@@ -0,0 +1,83 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:48
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+import networking.models
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Greatest, Least
+
+
+# Keep the most meaningful of two opposite requests: accepted, then pending, then blocked
+STATUS_PRIORITY = {'accepted': 0, 'pending': 1, 'blocked': 2}
+
+
+def delete_reverse_duplicates(apps, schema_editor):
+    ''' Leave one connection per pair where both users had sent a request '''
+    UserConnection = apps.get_model('networking', 'UserConnection')
+    pairs = (
+        UserConnection.objects.order_by()
+        .values(low=Least('from_user', 'to_user'), high=Greatest('from_user', 'to_user'))
+        .annotate(n=Count('id'))
+        .filter(n__gt=1)
+    )
+    for pair in pairs:
+        low, high = pair['low'], pair['high']
+        connections = sorted(
+            UserConnection.objects.filter(from_user_id__in=[low, high], to_user_id__in=[low, high]),
+            key=lambda c: (STATUS_PRIORITY.get(c.status, 3), c.created_at, c.id),
+        )
+        UserConnection.objects.filter(id__in=[c.id for c in connections[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networking', '0004_network_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_reverse_duplicates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='userconnection',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='userconnection',
+            name='endpoints',
+            field=models.GeneratedField(db_persist=True, expression=networking.models.Endpoints('from_user', 'to_user'), output_field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), size=None)),
+        ),
+        migrations.AddField(
+            model_name='userconnection',
+            name='user_high',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Greatest('from_user', 'to_user'), output_field=models.BigIntegerField()),
+        ),
+        migrations.AddField(
+            model_name='userconnection',
+            name='user_low',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Least('from_user', 'to_user'), output_field=models.BigIntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='userconnection',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['endpoints'], name='connection_endpoints_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='userconnection',
+            index=django.contrib.postgres.indexes.GinIndex(condition=models.Q(('status', 'accepted')), fields=['endpoints'], name='connection_accepted_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='userconnection',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['from_user'], name='connection_pending_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userconnection',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['to_user'], name='connection_pending_recv_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='userconnection',
+            constraint=models.UniqueConstraint(fields=('user_low', 'user_high'), name='unique_connection_pair'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networking', '0005_symmetric_connection_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userconnection',
+            index=models.Index(fields=['from_user', '-created_at', '-id'], name='connection_sent_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userconnection',
+            index=models.Index(fields=['to_user', '-created_at', '-id'], name='connection_recv_recent_idx'),
+        ),
+    ]
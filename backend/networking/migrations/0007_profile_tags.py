@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:51
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_tags(apps, schema_editor):
+    ''' Split existing skills/interests text into tags (same rules as networking.tags) '''
+    NetworkProfile = apps.get_model('networking', 'NetworkProfile')
+    Tag = apps.get_model('networking', 'Tag')
+    Link = NetworkProfile.tags.through
+
+    wanted = {}
+    for profile_id, skills, interests in NetworkProfile.objects.values_list('id', 'skills', 'interests'):
+        for kind, text in (('skill', skills), ('interest', interests)):
+            for label in (text or '').split(','):
+                label = label.strip()
+                if label:
+                    wanted.setdefault((kind, label.lower()), [label, set()])[1].add(profile_id)
+
+    Tag.objects.bulk_create(
+        [Tag(kind=kind, name=name, label=label) for (kind, name), (label, _) in wanted.items()],
+        batch_size=1000,
+    )
+    tag_ids = {(kind, name): tag_id for tag_id, kind, name in Tag.objects.values_list('id', 'kind', 'name')}
+    Link.objects.bulk_create(
+        [
+            Link(networkprofile_id=profile_id, tag_id=tag_ids[key])
+            for key, (_, profile_ids) in wanted.items()
+            for profile_id in profile_ids
+        ],
+        batch_size=1000,
+    )
+    for tag_id, count in Link.objects.values_list('tag_id').annotate(n=Count('id')).values_list('tag_id', 'n'):
+        Tag.objects.filter(id=tag_id).update(profile_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networking', '0006_connection_recent_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('skill', 'Skill'), ('interest', 'Interest')], max_length=20)),
+                ('name', models.CharField(max_length=200)),
+                ('label', models.CharField(max_length=200)),
+                ('profile_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', '-profile_count'], name='tag_kind_popularity_idx')],
+                'unique_together': {('kind', 'name')},
+            },
+        ),
+        migrations.AddField(
+            model_name='networkprofile',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='profiles', to='networking.tag'),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:54
+
+from django.db import migrations
+
+ROLE_RANK = "COALESCE(array_position(ARRAY['member', 'organizer', 'admin']::varchar[], {}), 0)"
+
+# Fold networking-only memberships into clubs.Membership. Where both tables
+# hold a pair, the higher role and the earlier join date win
+MERGE_MEMBERSHIPS = f"""
+INSERT INTO clubs_membership (user_id, club_id, role, date_joined)
+SELECT user_id, club_id, role, joined_at::date FROM networking_clubmembership
+ON CONFLICT (user_id, club_id) DO UPDATE SET
+    role = CASE
+        WHEN {ROLE_RANK.format('EXCLUDED.role')} > {ROLE_RANK.format('clubs_membership.role')} THEN EXCLUDED.role
+        ELSE clubs_membership.role
+    END,
+    date_joined = LEAST(clubs_membership.date_joined, EXCLUDED.date_joined);
+"""
+
+# Stored club counts now include memberships made through the clubs app
+RECOUNT_MEMBERSHIPS = """
+UPDATE networking_networkcounters counters
+SET club_memberships = (SELECT COUNT(*) FROM clubs_membership m WHERE m.user_id = counters.user_id);
+"""
+
+# Going back, the recreated networking table gets a copy of every membership
+SPLIT_MEMBERSHIPS = """
+INSERT INTO networking_clubmembership (user_id, club_id, role, joined_at)
+SELECT user_id, club_id, role, date_joined FROM clubs_membership;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0008_membership_covering_indexes'),
+        ('networking', '0008_interest_neighbors'),
+    ]
+
+    operations = [
+        migrations.RunSQL(MERGE_MEMBERSHIPS + RECOUNT_MEMBERSHIPS, reverse_sql=SPLIT_MEMBERSHIPS),
+        migrations.DeleteModel(
+            name='ClubMembership',
+        ),
+        migrations.CreateModel(
+            name='ClubMembership',
+            fields=[
+            ],
+            options={
+                'ordering': ['-date_joined'],
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('clubs.membership',),
+        ),
+    ]
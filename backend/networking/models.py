@@ -1,6 +1,32 @@
 from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Greatest, Least, Upper
 from users.models import User
-from clubs.models import Club
+from clubs.models import Membership
+
+
+class Endpoints(models.Func):
+    """ARRAY[a, b] of the given columns"""
+    template = "ARRAY[%(expressions)s]"
+    output_field = ArrayField(models.BigIntegerField())
+
+
+class UserConnectionQuerySet(models.QuerySet):
+    """Direction-agnostic lookups, each answered by a single index probe"""
+
+    def involving(self, user):
+        """Connections with user at either end"""
+        return self.filter(endpoints__contains=[getattr(user, 'pk', user)])
+
+    def involving_any(self, users):
+        """Connections with any of users at either end"""
+        return self.filter(endpoints__overlap=[getattr(user, 'pk', user) for user in users])
+
+    def between(self, user, other):
+        """The connection between two users, whichever of them sent it"""
+        low, high = sorted([getattr(user, 'pk', user), getattr(other, 'pk', other)])
+        return self.filter(user_low=low, user_high=high)
 
 
 class UserConnection(models.Model):
@@ -15,9 +41,39 @@ class UserConnection(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     message = models.TextField(blank=True, help_text="Optional message when sending connection request")
+    # Direction-free edge key and endpoint array, maintained by the database
+    user_low = models.GeneratedField(
+        expression=Least('from_user', 'to_user'),
+        output_field=models.BigIntegerField(),
+        db_persist=True,
+    )
+    user_high = models.GeneratedField(
+        expression=Greatest('from_user', 'to_user'),
+        output_field=models.BigIntegerField(),
+        db_persist=True,
+    )
+    endpoints = models.GeneratedField(
+        expression=Endpoints('from_user', 'to_user'),
+        output_field=ArrayField(models.BigIntegerField()),
+        db_persist=True,
+    )
+
+    objects = UserConnectionQuerySet.as_manager()
     
     class Meta:
-        unique_together = ['from_user', 'to_user']
+        constraints = [
+            # One connection per pair of users, whichever direction it was sent in
+            models.UniqueConstraint(fields=['user_low', 'user_high'], name='unique_connection_pair'),
+        ]
+        indexes = [
+            GinIndex(fields=['endpoints'], name='connection_endpoints_gin'),
+            GinIndex(fields=['endpoints'], name='connection_accepted_gin', condition=models.Q(status='accepted')),
+            models.Index(fields=['from_user'], name='connection_pending_sent_idx', condition=models.Q(status='pending')),
+            models.Index(fields=['to_user'], name='connection_pending_recv_idx', condition=models.Q(status='pending')),
+            # Newest-first keyset paging of a user's sent and received connections
+            models.Index(fields=['from_user', '-created_at', '-id'], name='connection_sent_recent_idx'),
+            models.Index(fields=['to_user', '-created_at', '-id'], name='connection_recv_recent_idx'),
+        ]
         ordering = ['-created_at']
         verbose_name_plural = "User Connections"
     
@@ -25,6 +81,31 @@ class UserConnection(models.Model):
         return f"{self.from_user.username} -> {self.to_user.username} ({self.status})"
 
 
+class Tag(models.Model):
+    """A normalized skill or interest, shared by every profile that lists it"""
+    KIND_CHOICES = [
+        ('skill', 'Skill'),
+        ('interest', 'Interest'),
+    ]
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Lowercased lookup key, and the spelling it was first entered with; as
+    # wide as the skills/interests text, which may hold a single tag
+    name = models.CharField(max_length=200)
+    label = models.CharField(max_length=200)
+    # Profiles listing this tag, kept current by networking.tags
+    profile_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['kind', 'name']
+        indexes = [
+            # Facet counts: most used tags of a kind
+            models.Index(fields=['kind', '-profile_count'], name='tag_kind_popularity_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.label}"
+
+
 class NetworkProfile(models.Model):
     """Extended profile for networking features"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='network_profile')
@@ -35,25 +116,84 @@ class NetworkProfile(models.Model):
     github_url = models.URLField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Normalized skills and interests, derived from the text fields on save
+    tags = models.ManyToManyField(Tag, related_name='profiles', blank=True)
+
+    class Meta:
+        # Trigram indexes for people search (see networking.search)
+        indexes = [
+            GinIndex(OpClass(Upper("bio"), name="gin_trgm_ops"), name="netprofile_bio_trgm"),
+            GinIndex(OpClass(Upper("skills"), name="gin_trgm_ops"), name="netprofile_skills_trgm"),
+        ]
     
     def __str__(self):
         return f"Network Profile: {self.user.username}"
 
 
-class ClubMembership(models.Model):
-    """Tracks which clubs users are members of for networking suggestions"""
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='club_memberships')
-    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='network_members')
-    role = models.CharField(max_length=50, default='member', choices=[
-        ('member', 'Member'),
-        ('organizer', 'Organizer'),
-        ('admin', 'Admin'),
-    ])
-    joined_at = models.DateTimeField(auto_now_add=True)
+class ClubMembership(Membership):
+    """
+    Networking's view of club membership. Memberships live in clubs.Membership
+    only; this proxy keeps the networking names for code that reads them.
+    """
     
     class Meta:
-        unique_together = ['user', 'club']
-        ordering = ['-joined_at']
+        proxy = True
+        ordering = ['-date_joined']
+    
+    @property
+    def joined_at(self):
+        return self.date_joined
     
     def __str__(self):
         return f"{self.user.username} - {self.club.name} ({self.role})"
+
+
+class ClubNeighbor(models.Model):
+    """Precomputed top-k co-membership neighbours, rebuilt by rebuild_club_neighbors"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='club_neighbors')
+    neighbor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    shared_clubs = models.PositiveIntegerField()
+    jaccard = models.FloatField(help_text="Shared clubs over clubs either user belongs to")
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['user', 'neighbor']
+        indexes = [
+            models.Index(fields=['user', '-jaccard'], name='clubneighbor_user_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} ~ {self.neighbor.username} ({self.jaccard:.2f})"
+
+
+class InterestNeighbor(models.Model):
+    """Precomputed top-k neighbours by skill/interest TF-IDF cosine similarity, see networking.interests"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='interest_neighbors')
+    neighbor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    similarity = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['user', 'neighbor']
+        indexes = [
+            models.Index(fields=['user', '-similarity'], name='interestneighbor_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} ~ {self.neighbor.username} ({self.similarity:.2f})"
+
+
+class NetworkCounters(models.Model):
+    """Denormalized per-user networking counts read by network_stats, see networking.stats"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='network_counters')
+    total_connections = models.PositiveIntegerField(default=0)
+    pending_sent = models.PositiveIntegerField(default=0)
+    pending_received = models.PositiveIntegerField(default=0)
+    club_memberships = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Network Counters"
+
+    def __str__(self):
+        return f"Network Counters: {self.user.username}"
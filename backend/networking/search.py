@@ -0,0 +1,58 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Q
+from django.db.models.functions import Greatest, Upper
+
+# Every column here has a pg_trgm GIN index on UPPER(column), which serves
+# icontains/istartswith (UPPER(col) LIKE UPPER(...)) and the %> operator alike
+USER_FIELDS = ("username", "first_name", "last_name", "email")
+PROFILE_FIELDS = ("network_profile__bio", "network_profile__skills")
+AUTOCOMPLETE_FIELDS = ("username", "first_name", "last_name")
+
+SEARCH_MODES = ("contains", "similar", "prefix")
+
+
+def any_field(fields, lookup, term):
+    ''' OR of the same lookup over several fields '''
+    q = Q()
+    for field in fields:
+        q |= Q(**{f"{field}__{lookup}": term})
+    return q
+
+
+def similar_to(users, fields, term):
+    '''
+    Rows where any field contains a word similar to term, scored by the best
+    word similarity. Filters on UPPER(field) so the trigram indexes apply.
+    '''
+    aliases = {f"{field.replace('__', '_')}_upper": Upper(field) for field in fields}
+    return (
+        users.alias(**aliases)
+        .filter(any_field(aliases, "trigram_word_similar", term))
+        .annotate(score=Greatest(*[TrigramWordSimilarity(term, field) for field in fields]))
+    )
+
+
+def search_user_ids(users, term, mode, limit):
+    '''
+    Ids of at most `limit` users in `users` matching term, in result order.
+
+    User columns and profile columns are searched in separate queries: an OR
+    that spans the profile join can't use the indexes on either table.
+    '''
+    if mode == "prefix":
+        matches = users.filter(any_field(AUTOCOMPLETE_FIELDS, "istartswith", term))
+        return list(matches.order_by("username", "id").values_list("id", flat=True)[:limit])
+
+    if mode == "similar":
+        scores = {}
+        for fields in (USER_FIELDS, PROFILE_FIELDS):
+            best = similar_to(users, fields, term).order_by("-score", "id").values_list("id", "score")[:limit]
+            for user_id, score in best:
+                scores[user_id] = max(score, scores.get(user_id, 0))
+        return sorted(scores, key=lambda user_id: (-scores[user_id], user_id))[:limit]
+
+    ids = set()
+    for fields in (USER_FIELDS, PROFILE_FIELDS):
+        matches = users.filter(any_field(fields, "icontains", term))
+        ids.update(matches.order_by("id").values_list("id", flat=True)[:limit])
+    return sorted(ids)[:limit]
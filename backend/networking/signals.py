@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.db.models import Q
+from clubs.models import Membership
+from .models import ClubMembership, InterestNeighbor, NetworkProfile, UserConnection
+from .stats import refresh_counters
+from .tags import TAG_SOURCES, release_profile_tags, sync_profile_tags
+
+
+def refresh_interests(user_id):
+    ''' Rescore a user's interest matches; NumPy is only loaded when this runs '''
+    from .interests import refresh_interest_neighbors
+    refresh_interest_neighbors(user_id)
+
+
+def refresh_after_commit(*user_ids):
+    '''
+    Recount once the write is committed. Deferring also keeps the upsert out
+    of cascades that are about to delete the user itself.
+    '''
+    transaction.on_commit(lambda: refresh_counters(user_ids))
+
+
+@receiver(post_save, sender=UserConnection)
+@receiver(post_delete, sender=UserConnection)
+def connection_changed(sender, instance, **kwargs):
+    """
+    Requests, accepts and removals move counts for both users.
+    """
+    refresh_after_commit(instance.from_user_id, instance.to_user_id)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+@receiver(post_save, sender=ClubMembership)
+@receiver(post_delete, sender=ClubMembership)
+def club_membership_changed(sender, instance, **kwargs):
+    """
+    Joining or leaving a club changes the member's club count. Proxy saves
+    are sent with the proxy as sender, so both are listened to.
+    """
+    refresh_after_commit(instance.user_id)
+
+
+@receiver(post_save, sender=NetworkProfile)
+def profile_saved(sender, instance, update_fields=None, **kwargs):
+    """
+    Re-derive the profile's skill and interest tags from its text fields.
+    """
+    if update_fields is not None and not set(TAG_SOURCES.values()).intersection(update_fields):
+        return
+    if sync_profile_tags(instance):
+        user_id = instance.user_id
+        transaction.on_commit(lambda: refresh_interests(user_id))
+
+
+@receiver(pre_delete, sender=NetworkProfile)
+def profile_deleted(sender, instance, **kwargs):
+    """
+    Drop the profile from its tags' counts while the links still exist, and
+    from everyone's interest matches.
+    """
+    release_profile_tags(instance)
+    InterestNeighbor.objects.filter(Q(user_id=instance.user_id) | Q(neighbor_id=instance.user_id)).delete()
@@ -0,0 +1,54 @@
+from django.db.models import OuterRef
+from users.models import User
+from clubs.models import Membership
+from .models import NetworkCounters, UserConnection
+from .suggestions import SubqueryCount
+
+COUNTER_FIELDS = ["total_connections", "pending_sent", "pending_received", "club_memberships"]
+
+
+def count_stats(user_ids):
+    '''
+    {user id: {counter: value}} for existing users among user_ids, counted
+    from the source tables in one statement. Each count is its own indexed
+    subquery rather than an OR over both ends of a connection.
+    '''
+    user = OuterRef("pk")
+    connections = UserConnection.objects.order_by()
+    rows = (
+        User.objects.filter(id__in=user_ids)
+        .annotate(
+            total_connections=(
+                SubqueryCount(connections.filter(from_user=user, status="accepted").values("id"))
+                + SubqueryCount(connections.filter(to_user=user, status="accepted").values("id"))
+            ),
+            pending_sent=SubqueryCount(connections.filter(from_user=user, status="pending").values("id")),
+            pending_received=SubqueryCount(connections.filter(to_user=user, status="pending").values("id")),
+            club_memberships=SubqueryCount(Membership.objects.filter(user=user).order_by().values("id")),
+        )
+        .values("id", *COUNTER_FIELDS)
+    )
+    return {row.pop("id"): row for row in rows}
+
+
+def refresh_counters(user_ids):
+    ''' Recount and upsert the counter rows of user_ids; deleted users are skipped '''
+    stats = count_stats(user_ids)
+    NetworkCounters.objects.bulk_create(
+        [NetworkCounters(user_id=user_id, **counts) for user_id, counts in stats.items()],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=COUNTER_FIELDS + ["updated_at"],
+    )
+    return stats
+
+
+def network_counters(user):
+    '''
+    The user's counters as a dict: one primary-key read once the row exists,
+    filled from the source tables on first use.
+    '''
+    counters = NetworkCounters.objects.filter(pk=user.pk).values(*COUNTER_FIELDS).first()
+    if counters is None:
+        counters = refresh_counters([user.pk]).get(user.pk, dict.fromkeys(COUNTER_FIELDS, 0))
+    return counters
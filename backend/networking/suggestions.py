@@ -0,0 +1,141 @@
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import F, IntegerField, OuterRef, Q, Subquery
+from users.models import User
+from clubs.models import Membership
+from .models import ClubNeighbor, InterestNeighbor, NetworkProfile, UserConnection
+
+# A mutual connection says more about knowing someone than a shared club
+SHARED_CLUB_WEIGHT = 1
+MUTUAL_CONNECTION_WEIGHT = 2
+
+
+class SubqueryCount(Subquery):
+    ''' COUNT(*) of a correlated subquery's rows '''
+    template = "(SELECT COUNT(*) FROM (%(subquery)s) _count)"
+    output_field = IntegerField()
+
+
+def connected_ids(user, status=None):
+    '''
+    Subqueries for the ids at the other end of user's sent and received
+    connections, optionally only those with the given status.
+    '''
+    connections = UserConnection.objects.all() if status is None else UserConnection.objects.filter(status=status)
+    return (
+        connections.filter(from_user=user).values("to_user_id"),
+        connections.filter(to_user=user).values("from_user_id"),
+    )
+
+
+def id_in(field, subqueries):
+    ''' Q for field being in any of the subqueries '''
+    q = Q()
+    for subquery in subqueries:
+        q |= Q(**{f"{field}__in": subquery})
+    return q
+
+
+def suggestion_queryset(user):
+    '''
+    Users who share a club or a connection with user and are not yet
+    connected to them, annotated with shared_clubs, common_clubs (names, or
+    None),
+    mutual_connections and score, best first. One SQL statement.
+    '''
+    my_clubs = Membership.objects.filter(user=user).values("club_id")
+    friends = connected_ids(user, status="accepted")
+
+    candidate = OuterRef("pk")
+    shared = Membership.objects.filter(user=candidate, club_id__in=my_clubs).order_by()
+    mutual = UserConnection.objects.filter(status="accepted").filter(
+        (Q(from_user=candidate) & id_in("to_user_id", friends))
+        | (Q(to_user=candidate) & id_in("from_user_id", friends))
+    ).order_by()
+    common_clubs = (
+        shared.values("user_id")
+        .annotate(names=ArrayAgg("club__name", ordering="club__name"))
+        .values("names")
+    )
+
+    # Co-members and friends of friends
+    candidates = (
+        Q(id__in=Membership.objects.filter(club_id__in=my_clubs).values("user_id"))
+        | id_in("id", [
+            UserConnection.objects.filter(status="accepted", from_user_id__in=subquery).values("to_user_id")
+            for subquery in friends
+        ])
+        | id_in("id", [
+            UserConnection.objects.filter(status="accepted", to_user_id__in=subquery).values("from_user_id")
+            for subquery in friends
+        ])
+    )
+
+    return (
+        User.objects.filter(candidates, is_active=True)
+        .exclude(id=user.id)
+        .exclude(id_in("id", connected_ids(user)))
+        .annotate(
+            shared_clubs=SubqueryCount(shared.values("id")),
+            mutual_connections=SubqueryCount(mutual.values("id")),
+            common_clubs=Subquery(common_clubs),
+        )
+        .annotate(score=F("shared_clubs") * SHARED_CLUB_WEIGHT + F("mutual_connections") * MUTUAL_CONNECTION_WEIGHT)
+        .order_by("-score", "id")
+    )
+
+
+def precomputed_suggestions(user):
+    '''
+    Stored club neighbours (see networking.comembership) of user who are not
+    connected to them, most similar first.
+    '''
+    return (
+        ClubNeighbor.objects.filter(user=user, neighbor__is_active=True)
+        .exclude(id_in("neighbor_id", connected_ids(user)))
+        .select_related("neighbor__network_profile")
+        .order_by("-jaccard", "-shared_clubs", "neighbor_id")
+    )
+
+
+def common_club_names(user, other_ids):
+    ''' {user id: sorted names of clubs shared with user} for other_ids, in one query '''
+    rows = (
+        Membership.objects.filter(
+            user_id__in=other_ids,
+            club_id__in=Membership.objects.filter(user=user).values("club_id"),
+        )
+        .values_list("user_id", "club__name")
+    )
+    names = {}
+    for user_id, name in rows:
+        names.setdefault(user_id, []).append(name)
+    return {user_id: sorted(club_names) for user_id, club_names in names.items()}
+
+
+def interest_suggestions(user):
+    '''
+    Stored interest matches (see networking.interests) of user who are not
+    connected to them, most similar first.
+    '''
+    return (
+        InterestNeighbor.objects.filter(user=user, neighbor__is_active=True)
+        .exclude(id_in("neighbor_id", connected_ids(user)))
+        .select_related("neighbor__network_profile")
+        .order_by("-similarity", "neighbor_id")
+    )
+
+
+def common_tag_labels(user, other_ids):
+    ''' {user id: sorted labels of skills and interests shared with user} for other_ids, in one query '''
+    links = NetworkProfile.tags.through.objects
+    rows = (
+        links.filter(
+            networkprofile__user_id__in=other_ids,
+            tag_id__in=links.filter(networkprofile__user=user).values("tag_id"),
+        )
+        .values_list("networkprofile__user_id", "tag__label")
+    )
+    labels = {}
+    for user_id, label in rows:
+        labels.setdefault(user_id, []).append(label)
+    return {user_id: sorted(tag_labels) for user_id, tag_labels in labels.items()}
@@ -0,0 +1,76 @@
+from django.db.models import F
+from .models import NetworkProfile, Tag
+
+# Text field each tag kind is parsed from
+TAG_SOURCES = {"skill": "skills", "interest": "interests"}
+
+
+def parse_tags(text):
+    ''' {normalized name: label} for a comma-separated list, first spelling wins '''
+    tags = {}
+    for label in (text or "").split(","):
+        label = label.strip()
+        if label:
+            tags.setdefault(label.lower(), label)
+    return tags
+
+
+def normalize_tags(values):
+    ''' Lookup names for user-supplied tags, e.g. from a query string '''
+    return sorted({value.strip().lower() for value in values if value.strip()})
+
+
+def sync_profile_tags(profile):
+    '''
+    Point profile.tags at the tags in its skills and interests text, creating
+    missing tags and moving profile_count on the ones added or dropped.
+    Returns whether any tag was added or dropped.
+    '''
+    wanted = {}
+    for kind, field in TAG_SOURCES.items():
+        for name, label in parse_tags(getattr(profile, field)).items():
+            wanted[(kind, name)] = label
+
+    Tag.objects.bulk_create(
+        [Tag(kind=kind, name=name, label=label) for (kind, name), label in wanted.items()],
+        ignore_conflicts=True,
+    )
+    wanted_ids = set()
+    for kind in TAG_SOURCES:
+        names = [name for tag_kind, name in wanted if tag_kind == kind]
+        if names:
+            wanted_ids.update(Tag.objects.filter(kind=kind, name__in=names).values_list("id", flat=True))
+
+    current_ids = set(profile.tags.values_list("id", flat=True))
+    added, removed = wanted_ids - current_ids, current_ids - wanted_ids
+    if added:
+        profile.tags.add(*added)
+        Tag.objects.filter(id__in=added).update(profile_count=F("profile_count") + 1)
+    if removed:
+        profile.tags.remove(*removed)
+        Tag.objects.filter(id__in=removed).update(profile_count=F("profile_count") - 1)
+    return bool(added or removed)
+
+
+def release_profile_tags(profile):
+    ''' Take a profile that is being deleted out of its tags' counts '''
+    profile.tags.all().update(profile_count=F("profile_count") - 1)
+
+
+def filter_by_tags(users, kind, names, match_all=True):
+    '''
+    Narrow a User queryset to profiles having all (or any) of the named tags
+    of one kind, using the tag and profile-tag indexes.
+    '''
+    names = normalize_tags(names)
+    tag_ids = list(Tag.objects.filter(kind=kind, name__in=names).values_list("id", flat=True))
+    if match_all:
+        # An unknown tag can't be matched by anyone
+        if len(tag_ids) < len(names):
+            return users.none()
+        for tag_id in tag_ids:
+            users = users.filter(id__in=NetworkProfile.tags.through.objects.filter(tag_id=tag_id).values("networkprofile__user_id"))
+        return users
+    return users.filter(
+        id__in=NetworkProfile.tags.through.objects.filter(tag_id__in=tag_ids).values("networkprofile__user_id")
+    )
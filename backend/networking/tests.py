@@ -1,3 +1,401 @@
-from django.test import TestCase
+from django.test import TestCase, Client
+from users.models import User
+from clubs.models import Club, Membership
+from .models import NetworkProfile, UserConnection, ClubMembership, ClubNeighbor, InterestNeighbor
+from .comembership import rebuild_club_neighbors
+from .connections import connection_page
+from .interests import rebuild_interest_neighbors, refresh_candidates
 
-# Create your tests here.
+
+class NetworkUserSearchTests(TestCase):
+    """Tests for people search in network_users_list"""
+
+    def setUp(self):
+        self.client = Client()
+        self.mary = User.objects.create(username='mmacdonald', first_name='Mary', last_name='MacDonald')
+        self.martin = User.objects.create(username='mart', first_name='Martin', last_name='Smith')
+        self.doug = User.objects.create(username='dougj', first_name='Doug', last_name='Jones')
+        NetworkProfile.objects.create(user=self.doug, skills='Python,Marketing')
+
+    def search(self, **params):
+        response = self.client.get('/networking/users/', params)
+        self.assertEqual(response.status_code, 200)
+        return [u['username'] for u in response.json()['users']]
+
+    def test_contains_matches_user_and_profile_fields(self):
+        """Test substring search covers names and profile skills"""
+        self.assertEqual(self.search(search='mar'), ['mmacdonald', 'mart', 'dougj'])
+
+    def test_prefix_autocomplete(self):
+        """Test prefix mode only matches word starts and honours limit"""
+        self.assertEqual(self.search(search='mar', mode='prefix'), ['mart', 'mmacdonald'])
+        self.assertEqual(self.search(search='mar', mode='prefix', limit=1), ['mart'])
+
+    def test_similar_ranks_close_spellings(self):
+        """Test similarity mode tolerates misspellings that substring search misses"""
+        self.assertEqual(self.search(search='mcdonald'), [])
+        self.assertEqual(self.search(search='mcdonald', mode='similar'), ['mmacdonald'])
+
+    def test_unknown_mode(self):
+        """Test an unknown search mode is rejected"""
+        response = self.client.get('/networking/users/', {'search': 'mar', 'mode': 'fuzzy'})
+        self.assertEqual(response.status_code, 400)
+
+
+class NetworkSuggestionTests(TestCase):
+    """Tests for ranked network_suggestions"""
+
+    def setUp(self):
+        self.client = Client()
+        names = ['me', 'alice', 'bob', 'carol', 'dave', 'frank', 'eve']
+        self.users = {name: User.objects.create(username=name) for name in names}
+        art = Club.objects.create(name='Art', description='d')
+        band = Club.objects.create(name='Band', description='d')
+        for name, clubs in [('me', [art, band]), ('alice', [art, band]), ('bob', [band]), ('eve', [art])]:
+            for club in clubs:
+                ClubMembership.objects.create(user=self.users[name], club=club)
+        self.connect('me', 'dave')
+        self.connect('frank', 'me')
+        self.connect('carol', 'dave')
+        self.connect('frank', 'carol')
+        self.connect('me', 'eve', status='pending')
+
+    def connect(self, a, b, status='accepted'):
+        UserConnection.objects.create(from_user=self.users[a], to_user=self.users[b], status=status)
+
+    def test_suggestions_ranked_by_clubs_and_mutual_connections(self):
+        """Test connected users are left out and the rest ranked by score"""
+        self.client.force_login(self.users['me'])
+
+        response = self.client.get('/networking/suggestions/')
+
+        self.assertEqual(response.status_code, 200)
+        suggestions = response.json()['suggestions']
+        self.assertEqual([s['username'] for s in suggestions], ['carol', 'alice', 'bob'])
+        self.assertEqual(suggestions[0]['mutual_connections'], 2)
+        self.assertEqual(suggestions[0]['common_clubs'], [])
+        self.assertEqual(suggestions[1]['common_clubs'], ['Art', 'Band'])
+        self.assertEqual(suggestions[2]['common_clubs_count'], 1)
+
+
+class ClubNeighborTests(TestCase):
+    """Tests for the precomputed co-membership neighbours"""
+
+    def setUp(self):
+        self.client = Client()
+        self.users = [User.objects.create(username=f'user{i}') for i in range(4)]
+        clubs = [Club.objects.create(name=f'Club {i}', description='d') for i in range(3)]
+        # user0 and user1 share both of user0's clubs; user2 shares one; user3 none
+        Membership.objects.create(user=self.users[0], club=clubs[0], role='member')
+        ClubMembership.objects.create(user=self.users[0], club=clubs[1])
+        Membership.objects.create(user=self.users[1], club=clubs[0], role='member')
+        Membership.objects.create(user=self.users[1], club=clubs[1], role='member')
+        Membership.objects.create(user=self.users[2], club=clubs[1], role='member')
+        Membership.objects.create(user=self.users[2], club=clubs[2], role='member')
+        Membership.objects.create(user=self.users[3], club=clubs[2], role='member')
+
+    def test_rebuild_keeps_top_k_by_jaccard(self):
+        """Test neighbours are ranked by Jaccard similarity and cut at top_k"""
+        rebuild_club_neighbors(top_k=1)
+
+        best = {n.user_id: (n.neighbor_id, n.shared_clubs, n.jaccard) for n in ClubNeighbor.objects.all()}
+        u = [user.id for user in self.users]
+        self.assertEqual(best[u[0]], (u[1], 2, 1.0))
+        self.assertEqual(best[u[2]][0], u[3])
+        self.assertAlmostEqual(best[u[2]][2], 0.5)
+        self.assertEqual(ClubNeighbor.objects.count(), 4)
+
+    def test_precomputed_suggestions(self):
+        """Test network_suggestions can read the stored neighbours"""
+        rebuild_club_neighbors()
+        UserConnection.objects.create(from_user=self.users[0], to_user=self.users[1], status='pending')
+        self.client.force_login(self.users[0])
+
+        response = self.client.get('/networking/suggestions/', {'source': 'precomputed'})
+
+        suggestions = response.json()['suggestions']
+        self.assertEqual([s['username'] for s in suggestions], ['user2'])
+        self.assertEqual(suggestions[0]['common_clubs'], ['Club 1'])
+
+
+class ConnectionGraphTests(TestCase):
+    """Tests for mutual connections and degree-of-separation paths"""
+
+    def setUp(self):
+        self.client = Client()
+        self.users = {name: User.objects.create(username=name) for name in 'abcdef'}
+        # a - b - c - d - e, plus a - f - c and a pending b -> e
+        for from_name, to_name in [('a', 'b'), ('c', 'b'), ('c', 'd'), ('d', 'e'), ('f', 'a'), ('c', 'f')]:
+            UserConnection.objects.create(from_user=self.users[from_name], to_user=self.users[to_name], status='accepted')
+        UserConnection.objects.create(from_user=self.users['b'], to_user=self.users['e'], status='pending')
+        self.client.force_login(self.users['a'])
+
+    def test_mutual_connections(self):
+        """Test mutual connections ignore edge direction"""
+        response = self.client.get('/networking/mutual/', {'user_id': self.users['c'].id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([u['username'] for u in response.json()['mutual_connections']], ['b', 'f'])
+
+    def test_path_within_three_degrees(self):
+        """Test the shortest path only follows accepted connections"""
+        response = self.client.get('/networking/path/', {'user_id': self.users['d'].id})
+
+        body = response.json()
+        self.assertEqual(body['degree'], 3)
+        self.assertEqual([u['username'] for u in body['path']], ['a', 'b', 'c', 'd'])
+
+    def test_path_beyond_three_degrees(self):
+        """Test users four hops away are reported as unreachable"""
+        response = self.client.get('/networking/path/', {'user_id': self.users['e'].id})
+
+        self.assertEqual(response.json(), {'degree': None, 'path': []})
+
+
+class NetworkStatsTests(TestCase):
+    """Tests for network_stats and the counters behind it"""
+
+    def setUp(self):
+        self.client = Client()
+        self.me = User.objects.create(username='me')
+        self.others = [User.objects.create(username=f'other{i}') for i in range(3)]
+        self.club = Club.objects.create(name='Club', description='d')
+
+    def stats(self, **params):
+        return self.client.get('/networking/stats/', params).json()
+
+    def test_counts(self):
+        """Test each counter, from the stored row and counted fresh"""
+        UserConnection.objects.create(from_user=self.me, to_user=self.others[0], status='accepted')
+        UserConnection.objects.create(from_user=self.others[1], to_user=self.me, status='accepted')
+        UserConnection.objects.create(from_user=self.me, to_user=self.others[2], status='pending')
+        ClubMembership.objects.create(user=self.me, club=self.club)
+        self.client.force_login(self.me)
+
+        expected = {'total_connections': 2, 'pending_sent': 1, 'pending_received': 0, 'club_memberships': 1}
+        self.assertEqual(self.stats(), expected)
+        self.assertEqual(self.stats(fresh='true'), expected)
+
+    def test_counters_follow_accept_and_leave(self):
+        """Test the counter row is updated when connections and memberships change"""
+        self.client.force_login(self.others[0])
+        self.stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            connection = UserConnection.objects.create(from_user=self.me, to_user=self.others[0])
+            membership = ClubMembership.objects.create(user=self.others[0], club=self.club)
+        self.assertEqual(self.stats()['pending_received'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            connection.status = 'accepted'
+            connection.save()
+            membership.delete()
+
+        stats = self.stats()
+        self.assertEqual((stats['pending_received'], stats['total_connections'], stats['club_memberships']), (0, 1, 0))
+
+    def test_joining_through_clubs_counts(self):
+        """Test a membership made by the clubs app is the one networking reads"""
+        self.client.force_login(self.me)
+        self.stats()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/clubs/members/add/', {'club_id': self.club.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stats()['club_memberships'], 1)
+        self.assertEqual(ClubMembership.objects.get(user=self.me).club, self.club)
+
+
+class UserConnectionLookupTests(TestCase):
+    """Tests for the direction-free connection lookups"""
+
+    def setUp(self):
+        self.client = Client()
+        self.alice = User.objects.create(username='alice')
+        self.bob = User.objects.create(username='bob')
+        self.carol = User.objects.create(username='carol')
+        self.connection = UserConnection.objects.create(from_user=self.bob, to_user=self.alice, status='accepted')
+        UserConnection.objects.create(from_user=self.bob, to_user=self.carol)
+
+    def test_between_and_involving(self):
+        """Test lookups find a connection whichever user sent it"""
+        self.assertEqual(UserConnection.objects.between(self.alice, self.bob).get(), self.connection)
+        self.assertEqual(UserConnection.objects.between(self.bob.id, self.alice.id).get(), self.connection)
+        self.assertFalse(UserConnection.objects.between(self.alice, self.carol).exists())
+        self.assertEqual(UserConnection.objects.involving(self.bob).count(), 2)
+        self.assertEqual(list(UserConnection.objects.involving(self.alice)), [self.connection])
+
+    def test_connect_rejects_reverse_request(self):
+        """Test a request back to someone already connected is a duplicate"""
+        self.client.force_login(self.alice)
+
+        response = self.client.post(f'/networking/connect/?user_id={self.bob.id}')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['connection_id'], self.connection.id)
+        self.assertEqual(UserConnection.objects.count(), 2)
+
+
+class NetworkConnectionsListTests(TestCase):
+    """Tests for the paginated network_connections listing"""
+
+    def setUp(self):
+        self.client = Client()
+        self.me = User.objects.create(username='me')
+        self.connections = []
+        for i in range(5):
+            other = User.objects.create(username=f'other{i}')
+            NetworkProfile.objects.create(user=other, bio=f'Bio {i}')
+            pair = (self.me, other) if i % 2 else (other, self.me)
+            self.connections.append(UserConnection.objects.create(
+                from_user=pair[0], to_user=pair[1], status='pending' if i == 4 else 'accepted'
+            ))
+        self.client.force_login(self.me)
+
+    def test_pages_follow_cursor(self):
+        """Test pages cover every connection once, newest first, with status counts"""
+        seen, cursor = [], None
+        while True:
+            params = {'status': 'all', 'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            body = self.client.get('/networking/connections/', params).json()
+            seen += [c['id'] for c in body['connections']]
+            cursor = body['next_cursor']
+            if cursor is None:
+                break
+
+        expected = sorted(self.connections, key=lambda c: (c.created_at, c.id), reverse=True)
+        self.assertEqual(seen, [c.id for c in expected])
+        self.assertEqual(body['status_counts'], {'pending': 1, 'accepted': 4, 'blocked': 0})
+
+    def test_page_loads_profiles_without_extra_queries(self):
+        """Test a page is two queries however many profiles it shows"""
+        with self.assertNumQueries(2):
+            page, has_more = connection_page(self.me, status='accepted', limit=10)
+            bios = sorted(
+                (c.to_user if c.from_user_id == self.me.id else c.from_user).network_profile.bio
+                for c in page
+            )
+        self.assertEqual(bios, ['Bio 0', 'Bio 1', 'Bio 2', 'Bio 3'])
+        self.assertFalse(has_more)
+
+    def test_bad_cursor(self):
+        """Test a malformed cursor is rejected"""
+        response = self.client.get('/networking/connections/', {'cursor': 'nope'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ProfileTagTests(TestCase):
+    """Tests for normalized skills and interests"""
+
+    def setUp(self):
+        self.client = Client()
+        self.ann = User.objects.create(username='ann')
+        self.ben = User.objects.create(username='ben')
+        self.cal = User.objects.create(username='cal')
+        NetworkProfile.objects.create(user=self.ann, skills='Python, Django', interests='Music')
+        NetworkProfile.objects.create(user=self.ben, skills='python,React', interests='')
+        self.cal_profile = NetworkProfile.objects.create(user=self.cal, skills='Django', interests='music, Art')
+
+    def usernames(self, **params):
+        return sorted(u['username'] for u in self.client.get('/networking/users/', params).json()['users'])
+
+    def test_skill_filters(self):
+        """Test all/any matching is case-insensitive and combines with interests"""
+        self.assertEqual(self.usernames(skills='PYTHON,django'), ['ann'])
+        self.assertEqual(self.usernames(skills='react,Django', match='any'), ['ann', 'ben', 'cal'])
+        self.assertEqual(self.usernames(skills='django', interests='art'), ['cal'])
+        self.assertEqual(self.usernames(skills='python,cobol'), [])
+
+    def test_single_tag_fills_skills(self):
+        """Test a skill as long as the whole skills field is stored as one tag"""
+        skill = 'x' * NetworkProfile._meta.get_field('skills').max_length
+        self.cal_profile.skills = skill
+        self.cal_profile.save()
+
+        self.assertEqual(self.usernames(skills=skill), ['cal'])
+
+    def test_listing_uses_tags(self):
+        """Test users come back with their tag labels"""
+        users = self.client.get('/networking/users/', {'skills': 'react'}).json()['users']
+        # Labels keep the spelling the tag was first entered with
+        self.assertEqual(users[0]['skills'], ['Python', 'React'])
+
+    def test_facet_counts_follow_edits(self):
+        """Test tag popularity is kept current as profiles change"""
+        response = self.client.get('/networking/tags/', {'kind': 'skill'})
+        self.assertEqual(
+            [(t['name'], t['count']) for t in response.json()['tags']],
+            [('django', 2), ('python', 2), ('react', 1)]
+        )
+
+        self.cal_profile.skills = 'React'
+        self.cal_profile.save()
+        self.ann.delete()
+
+        response = self.client.get('/networking/tags/', {'kind': 'skill'})
+        self.assertEqual(
+            [(t['name'], t['count']) for t in response.json()['tags']],
+            [('react', 2), ('python', 1)]
+        )
+
+
+class InterestNeighborTests(TestCase):
+    """Tests for skill and interest similarity suggestions"""
+
+    def setUp(self):
+        self.client = Client()
+        self.users = {name: User.objects.create(username=name) for name in ['ann', 'ben', 'cal', 'dee']}
+        self.profiles = {
+            'ann': NetworkProfile.objects.create(user=self.users['ann'], skills='Python, Django', interests='Chess'),
+            'ben': NetworkProfile.objects.create(user=self.users['ben'], skills='Python, Django', interests='Chess'),
+            'cal': NetworkProfile.objects.create(user=self.users['cal'], skills='Python', interests='Hiking'),
+            'dee': NetworkProfile.objects.create(user=self.users['dee'], skills='Welding'),
+        }
+
+    def neighbors(self, name):
+        return list(
+            InterestNeighbor.objects.filter(user=self.users[name])
+            .order_by('-similarity').values_list('neighbor__username', flat=True)
+        )
+
+    def test_rebuild_ranks_by_cosine(self):
+        """Test the full rebuild ranks closer profiles first and skips no-overlap users"""
+        rebuild_interest_neighbors()
+
+        self.assertEqual(self.neighbors('ann'), ['ben', 'cal'])
+        self.assertEqual(self.neighbors('dee'), [])
+        match = InterestNeighbor.objects.get(user=self.users['ann'], neighbor=self.users['ben'])
+        self.assertAlmostEqual(match.similarity, 1.0)
+
+    def test_profile_edit_rescores_user(self):
+        """Test editing a profile refreshes that user's matches and their place in others'"""
+        rebuild_interest_neighbors()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profiles['dee'].skills = 'Python, Django'
+            self.profiles['dee'].interests = 'Chess'
+            self.profiles['dee'].save()
+
+        self.assertEqual(self.neighbors('dee')[:2], ['ann', 'ben'])
+        self.assertIn('dee', self.neighbors('ann'))
+
+    def test_refresh_candidates_prefer_rare_overlap(self):
+        """Test the refresh rescores the users sharing the most and rarest tags first"""
+        def ids(names):
+            return {self.profiles[name].id for name in names}
+
+        self.assertEqual(refresh_candidates(self.users['cal'].id, limit=1), ids(['cal', 'ann']))
+        self.assertEqual(refresh_candidates(self.users['ann'].id, limit=1), ids(['ann', 'ben']))
+        self.assertEqual(refresh_candidates(self.users['dee'].id), ids(['dee']))
+
+    def test_suggestions_interest_source(self):
+        """Test network_suggestions serves interest matches with shared tags"""
+        rebuild_interest_neighbors()
+        self.client.force_login(self.users['cal'])
+
+        response = self.client.get('/networking/suggestions/', {'source': 'interests'})
+
+        suggestions = response.json()['suggestions']
+        self.assertEqual([s['username'] for s in suggestions], ['ann', 'ben'])
+        self.assertEqual(suggestions[0]['common_tags'], ['Python'])
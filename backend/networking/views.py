@@ -2,11 +2,24 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST, require_http_methods
 from users.models import User
-from django.db.models import Q
-from clubs.models import Club
-from .models import UserConnection, NetworkProfile, ClubMembership
+from django.db import IntegrityError
+from django.utils.dateparse import parse_datetime
+from clubs.views import encode_cursor, decode_cursor
+from django.db.models import Prefetch, prefetch_related_objects
+from .models import UserConnection, NetworkProfile, Tag
+from .search import SEARCH_MODES, search_user_ids
+from .suggestions import (
+    suggestion_queryset, precomputed_suggestions, common_club_names, interest_suggestions, common_tag_labels
+)
+from .graph import mutual_connection_ids, shortest_path
+from .stats import count_stats, network_counters
+from .tags import filter_by_tags, TAG_SOURCES
+from .connections import connection_page, status_counts, CONNECTIONS_PAGE_SIZE, CONNECTIONS_MAX_PAGE_SIZE
 import json
 
+AUTOCOMPLETE_LIMIT = 10
+MAX_USERS_LIMIT = 200
+
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -14,7 +27,12 @@ def network_users_list(request):
     """Get list of users for networking. Supports search and filtering."""
     try:
         search_query = request.GET.get('search', '').strip()
-        limit = int(request.GET.get('limit', 50))
+        mode = request.GET.get('mode', 'contains')
+        if mode not in SEARCH_MODES:
+            return JsonResponse({'error': f"mode must be one of {', '.join(SEARCH_MODES)}"}, status=400)
+        # Autocomplete fires on every keystroke, so it gets a small default page
+        default_limit = AUTOCOMPLETE_LIMIT if mode == 'prefix' else 50
+        limit = min(int(request.GET.get('limit', default_limit)), MAX_USERS_LIMIT)
         exclude_self = request.GET.get('exclude_self', 'true').lower() == 'true'
         
         # Get current user if authenticated
@@ -33,36 +51,37 @@ def network_users_list(request):
         if exclude_self and current_user_id:
             users = users.exclude(id=current_user_id)
         
-        # Search filter
+        # Tag filters - skills=a,b and/or interests=c,d, all (default) or any of them
+        tag_match = request.GET.get('match', 'all')
+        if tag_match not in ('all', 'any'):
+            return JsonResponse({'error': 'match must be all or any'}, status=400)
+        for kind, param in (('skill', 'skills'), ('interest', 'interests')):
+            names = request.GET.get(param, '')
+            if names.strip():
+                users = filter_by_tags(users, kind, names.split(','), match_all=tag_match == 'all')
+        
+        # Search filter - each mode runs as a few trigram-indexed queries over ids
         if search_query:
-            try:
-                users = users.filter(
-                    Q(username__icontains=search_query) |
-                    Q(first_name__icontains=search_query) |
-                    Q(last_name__icontains=search_query) |
-                    Q(email__icontains=search_query) |
-                    Q(network_profile__bio__icontains=search_query) |
-                    Q(network_profile__skills__icontains=search_query)
-                )
-            except Exception:
-                # If network_profile table doesn't exist, search without it
-                users = users.filter(
-                    Q(username__icontains=search_query) |
-                    Q(first_name__icontains=search_query) |
-                    Q(last_name__icontains=search_query) |
-                    Q(email__icontains=search_query)
-                )
+            user_ids = search_user_ids(users, search_query, mode, limit)
+            users_by_id = {user.id: user for user in users.filter(id__in=user_ids)}
+            users = [users_by_id[user_id] for user_id in user_ids if user_id in users_by_id]
+        else:
+            # Limit results - convert to list to avoid lazy evaluation issues
+            users = list(users[:limit])
         
-        # Limit results - convert to list to avoid lazy evaluation issues
-        users = list(users[:limit])
+        # Skills and interests for the whole page in one query
+        prefetch_related_objects(users, Prefetch('network_profile__tags', queryset=Tag.objects.order_by('label')))
         
         # Get connection status for current user - handle if table doesn't exist
         connections_map = {}
         if current_user_id:
             try:
-                connections = UserConnection.objects.filter(
-                    Q(from_user_id=current_user_id) | Q(to_user_id=current_user_id)
-                ).select_related('from_user', 'to_user')
+                # Only the connections to users on this page
+                connections = (
+                    UserConnection.objects.involving(current_user_id)
+                    .involving_any([user.id for user in users])
+                    .only('id', 'from_user_id', 'to_user_id', 'status')
+                )
                 
                 for conn in connections:
                     other_user_id = conn.to_user_id if conn.from_user_id == current_user_id else conn.from_user_id
@@ -81,20 +100,7 @@ def network_users_list(request):
             try:
                 profile = getattr(user, 'network_profile', None)
                 
-                # Safely extract skills and interests
-                skills_list = []
-                interests_list = []
-                if profile:
-                    if hasattr(profile, 'skills') and profile.skills:
-                        try:
-                            skills_list = profile.skills.split(',')
-                        except (AttributeError, TypeError):
-                            skills_list = []
-                    if hasattr(profile, 'interests') and profile.interests:
-                        try:
-                            interests_list = profile.interests.split(',')
-                        except (AttributeError, TypeError):
-                            interests_list = []
+                tags = list(profile.tags.all()) if profile else []
                 
                 user_data = {
                     'id': user.id,
@@ -104,8 +110,8 @@ def network_users_list(request):
                     'email': user.email or '',
                     'full_name': user.get_full_name() or user.username,
                     'bio': getattr(profile, 'bio', '') if profile else '',
-                    'skills': [s.strip() for s in skills_list if s and s.strip()],
-                    'interests': [i.strip() for i in interests_list if i and i.strip()],
+                    'skills': [tag.label for tag in tags if tag.kind == 'skill'],
+                    'interests': [tag.label for tag in tags if tag.kind == 'interest'],
                     'linkedin_url': getattr(profile, 'linkedin_url', '') if profile else '',
                     'github_url': getattr(profile, 'github_url', '') if profile else '',
                     'connection_status': connections_map.get(user.id, None),
@@ -121,7 +127,8 @@ def network_users_list(request):
         return JsonResponse({
             'users': users_data,
             'count': len(users_data),
-            'search_query': search_query
+            'search_query': search_query,
+            'mode': mode
         })
     
     except Exception as e:
@@ -132,6 +139,39 @@ def network_users_list(request):
         }, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["GET"])
+def network_tags(request):
+    """Get the most used skills or interests with the number of profiles listing each"""
+    try:
+        kind = request.GET.get('kind', 'skill')
+        if kind not in TAG_SOURCES:
+            return JsonResponse({'error': 'kind must be skill or interest'}, status=400)
+        limit = min(int(request.GET.get('limit', 20)), MAX_USERS_LIMIT)
+        
+        # Counts are stored on the tags, so this reads the top of one index
+        tags = (
+            Tag.objects.filter(kind=kind, profile_count__gt=0)
+            .order_by('-profile_count', 'name')
+            .values('name', 'label', 'profile_count')[:limit]
+        )
+        
+        tags_data = [{
+            'name': tag['name'],
+            'label': tag['label'],
+            'count': tag['profile_count'],
+        } for tag in tags]
+        
+        return JsonResponse({
+            'kind': kind,
+            'tags': tags_data,
+            'count': len(tags_data)
+        })
+    
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def network_connections(request):
@@ -140,19 +180,39 @@ def network_connections(request):
         if not request.user.is_authenticated:
             return JsonResponse({'error': 'Authentication required'}, status=401)
         
-        status_filter = request.GET.get('status', 'accepted')  # pending, accepted, all
-        
-        # Get connections where user is involved
-        connections = UserConnection.objects.filter(
-            Q(from_user=request.user) | Q(to_user=request.user)
-        ).select_related('from_user', 'to_user')
-        
-        if status_filter != 'all':
-            connections = connections.filter(status=status_filter)
+        status_filter = request.GET.get('status', 'accepted')  # pending, accepted, blocked, all
+        if status_filter != 'all' and status_filter not in dict(UserConnection.STATUS_CHOICES):
+            return JsonResponse({'error': 'Invalid status'}, status=400)
+        try:
+            limit = min(int(request.GET.get('limit', CONNECTIONS_PAGE_SIZE)), CONNECTIONS_MAX_PAGE_SIZE)
+        except ValueError:
+            return JsonResponse({'error': 'limit must be an integer'}, status=400)
+        if limit < 1:
+            return JsonResponse({'error': 'limit must be positive'}, status=400)
+        
+        # Continue after the last connection of the previous page
+        after = None
+        cursor = request.GET.get('cursor')
+        if cursor:
+            try:
+                created_at, connection_id = decode_cursor(cursor)
+                after = (parse_datetime(created_at), int(connection_id))
+                if after[0] is None:
+                    raise ValueError
+            except (ValueError, TypeError):
+                return JsonResponse({'error': 'invalid cursor'}, status=400)
+        
+        connections, has_more = connection_page(
+            request.user,
+            status=None if status_filter == 'all' else status_filter,
+            after=after,
+            limit=limit
+        )
         
         connections_data = []
         for conn in connections:
-            other_user = conn.to_user if conn.from_user == request.user else conn.from_user
+            is_sent = conn.from_user_id == request.user.id
+            other_user = conn.to_user if is_sent else conn.from_user
             profile = getattr(other_user, 'network_profile', None)
             
             connections_data.append({
@@ -165,14 +225,21 @@ def network_connections(request):
                     'email': other_user.email,
                 },
                 'status': conn.status,
-                'is_sent': conn.from_user == request.user,
+                'is_sent': is_sent,
                 'message': conn.message,
                 'created_at': conn.created_at.isoformat(),
             })
         
+        next_cursor = None
+        if has_more:
+            last = connections[-1]
+            next_cursor = encode_cursor([last.created_at.isoformat(), last.id])
+        
         return JsonResponse({
             'connections': connections_data,
-            'count': len(connections_data)
+            'count': len(connections_data),
+            'next_cursor': next_cursor,
+            'status_counts': status_counts(request.user),
         })
     
     except Exception as e:
@@ -205,11 +272,8 @@ def network_connect(request):
         if to_user == request.user:
             return JsonResponse({'error': 'Cannot connect to yourself'}, status=400)
         
-        # Check if connection already exists
-        existing = UserConnection.objects.filter(
-            Q(from_user=request.user, to_user=to_user) |
-            Q(from_user=to_user, to_user=request.user)
-        ).first()
+        # Check if connection already exists, in either direction
+        existing = UserConnection.objects.between(request.user, to_user).first()
         
         if existing:
             return JsonResponse({
@@ -218,13 +282,17 @@ def network_connect(request):
                 'connection_id': existing.id
             }, status=400)
         
-        # Create connection request
-        connection = UserConnection.objects.create(
-            from_user=request.user,
-            to_user=to_user,
-            status='pending',
-            message=message
-        )
+        # Create connection request; the pair constraint catches a request
+        # crossing with one from the other user
+        try:
+            connection = UserConnection.objects.create(
+                from_user=request.user,
+                to_user=to_user,
+                status='pending',
+                message=message
+            )
+        except IntegrityError:
+            return JsonResponse({'error': 'Connection already exists'}, status=400)
         
         return JsonResponse({
             'success': True,
@@ -275,63 +343,77 @@ def network_accept(request):
 @csrf_exempt
 @require_http_methods(["GET"])
 def network_suggestions(request):
-    """Get network suggestions based on common clubs"""
+    """Get network suggestions ranked by common clubs and mutual connections"""
     try:
         if not request.user.is_authenticated:
             return JsonResponse({'error': 'Authentication required'}, status=401)
         
         limit = int(request.GET.get('limit', 10))
-        
-        # Get user's club memberships
-        user_clubs = ClubMembership.objects.filter(
-            user=request.user
-        ).values_list('club_id', flat=True)
-        
-        if not user_clubs:
+        source = request.GET.get('source', 'live')
+        if source not in ('live', 'precomputed', 'interests'):
+            return JsonResponse({'error': 'source must be live, precomputed or interests'}, status=400)
+        
+        # Most similar skills and interests, from the stored TF-IDF matches
+        if source == 'interests':
+            matches = list(interest_suggestions(request.user)[:limit])
+            common = common_tag_labels(request.user, [m.neighbor_id for m in matches])
+            suggestions_data = []
+            for entry in matches:
+                user = entry.neighbor
+                profile = getattr(user, 'network_profile', None)
+                suggestions_data.append({
+                    'id': user.id,
+                    'username': user.username,
+                    'full_name': user.get_full_name() or user.username,
+                    'bio': profile.bio if profile else '',
+                    'common_tags': common.get(user.id, []),
+                    'similarity': entry.similarity,
+                })
             return JsonResponse({
-                'suggestions': [],
-                'count': 0
+                'suggestions': suggestions_data,
+                'count': len(suggestions_data)
             })
         
-        # Get users in same clubs
-        suggested_users = User.objects.filter(
-            club_memberships__club_id__in=user_clubs,
-            is_active=True
-        ).exclude(id=request.user.id).distinct()
-        
-        # Exclude users already connected
-        existing_connections = UserConnection.objects.filter(
-            Q(from_user=request.user) | Q(to_user=request.user)
-        ).values_list('from_user_id', 'to_user_id')
-        
-        connected_user_ids = set()
-        for from_id, to_id in existing_connections:
-            if from_id == request.user.id:
-                connected_user_ids.add(to_id)
-            else:
-                connected_user_ids.add(from_id)
-        
-        suggested_users = suggested_users.exclude(id__in=connected_user_ids)
+        # Campus-wide top-k neighbours from the last rebuild_club_neighbors run
+        if source == 'precomputed':
+            neighbors = list(precomputed_suggestions(request.user)[:limit])
+            common = common_club_names(request.user, [n.neighbor_id for n in neighbors])
+            suggestions_data = []
+            for entry in neighbors:
+                user = entry.neighbor
+                profile = getattr(user, 'network_profile', None)
+                suggestions_data.append({
+                    'id': user.id,
+                    'username': user.username,
+                    'full_name': user.get_full_name() or user.username,
+                    'bio': profile.bio if profile else '',
+                    'common_clubs': common.get(user.id, []),
+                    'common_clubs_count': entry.shared_clubs,
+                    'similarity': entry.jaccard,
+                    'computed_at': entry.computed_at.isoformat(),
+                })
+            return JsonResponse({
+                'suggestions': suggestions_data,
+                'count': len(suggestions_data)
+            })
         
-        # Limit and get profiles
-        suggested_users = suggested_users.select_related('network_profile')[:limit]
+        # Ranked by shared clubs and mutual connections, common club names included
+        suggested_users = suggestion_queryset(request.user).select_related('network_profile')[:limit]
         
         suggestions_data = []
         for user in suggested_users:
             profile = getattr(user, 'network_profile', None)
-            # Get common clubs
-            common_clubs = Club.objects.filter(
-                network_members__user=user,
-                id__in=user_clubs
-            ).values_list('name', flat=True).distinct()
+            common_clubs = user.common_clubs or []
             
             suggestions_data.append({
                 'id': user.id,
                 'username': user.username,
                 'full_name': user.get_full_name() or user.username,
                 'bio': profile.bio if profile else '',
-                'common_clubs': list(common_clubs),
+                'common_clubs': common_clubs,
                 'common_clubs_count': len(common_clubs),
+                'mutual_connections': user.mutual_connections,
+                'score': user.score,
             })
         
         return JsonResponse({
@@ -347,6 +429,79 @@ def network_suggestions(request):
         }, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["GET"])
+def network_mutual(request):
+    """Get the connections the current user shares with another user"""
+    try:
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+        
+        other_id = request.GET.get('user_id')
+        if not other_id:
+            return JsonResponse({'error': 'user_id is required'}, status=400)
+        
+        try:
+            other = User.objects.get(id=other_id, is_active=True)
+        except (User.DoesNotExist, ValueError):
+            return JsonResponse({'error': 'User not found'}, status=404)
+        
+        mutual_ids = mutual_connection_ids(request.user.id, other.id)
+        mutual = User.objects.filter(id__in=mutual_ids, is_active=True).order_by('username')
+        
+        mutual_data = [{
+            'id': user.id,
+            'username': user.username,
+            'full_name': user.get_full_name() or user.username,
+        } for user in mutual]
+        
+        return JsonResponse({
+            'mutual_connections': mutual_data,
+            'count': len(mutual_data)
+        })
+    
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def network_path(request):
+    """Get the shortest chain of connections from the current user to another user"""
+    try:
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+        
+        other_id = request.GET.get('user_id')
+        if not other_id:
+            return JsonResponse({'error': 'user_id is required'}, status=400)
+        
+        try:
+            other = User.objects.get(id=other_id, is_active=True)
+        except (User.DoesNotExist, ValueError):
+            return JsonResponse({'error': 'User not found'}, status=404)
+        
+        path_ids = shortest_path(request.user.id, other.id)
+        if path_ids is None:
+            # Further apart than MAX_DEGREE, or not linked at all
+            return JsonResponse({'degree': None, 'path': []})
+        
+        users_by_id = User.objects.in_bulk(path_ids)
+        path_data = [{
+            'id': user_id,
+            'username': users_by_id[user_id].username,
+            'full_name': users_by_id[user_id].get_full_name() or users_by_id[user_id].username,
+        } for user_id in path_ids]
+        
+        return JsonResponse({
+            'degree': len(path_ids) - 1,
+            'path': path_data
+        })
+    
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def network_stats(request):
@@ -362,32 +517,18 @@ def network_stats(request):
                 'club_memberships': 0
             }, status=401)
         
-        # Count connections
-        total_connections = UserConnection.objects.filter(
-            Q(from_user=request.user) | Q(to_user=request.user),
-            status='accepted'
-        ).count()
-        
-        pending_sent = UserConnection.objects.filter(
-            from_user=request.user,
-            status='pending'
-        ).count()
-        
-        pending_received = UserConnection.objects.filter(
-            to_user=request.user,
-            status='pending'
-        ).count()
-        
-        # Count club memberships
-        club_count = ClubMembership.objects.filter(
-            user=request.user
-        ).count()
+        # One primary-key read of the user's counter row, kept current by networking.signals;
+        # fresh=true counts from the source tables instead (one query)
+        if request.GET.get('fresh', 'false').lower() == 'true':
+            counters = count_stats([request.user.id])[request.user.id]
+        else:
+            counters = network_counters(request.user)
         
         return JsonResponse({
-            'total_connections': total_connections,
-            'pending_sent': pending_sent,
-            'pending_received': pending_received,
-            'club_memberships': club_count,
+            'total_connections': counters['total_connections'],
+            'pending_sent': counters['pending_sent'],
+            'pending_received': counters['pending_received'],
+            'club_memberships': counters['club_memberships'],
         })
     
     except Exception as e:
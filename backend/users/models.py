@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 
 '''
 
@@ -30,6 +32,13 @@ class User(AbstractUser):
     bio = models.CharField(max_length=300, blank=True)
     profile_picture = models.ImageField(upload_to="profiles/", blank=True)
 
+    class Meta(AbstractUser.Meta):
+        # Trigram indexes for people search (see networking.search)
+        indexes = [
+            GinIndex(OpClass(Upper(field), name="gin_trgm_ops"), name=f"user_{field}_trgm")
+            for field in ("username", "first_name", "last_name", "email")
+        ]
+
     def __str__(self):
         return f"User: {self.first_name} {self.last_name}"
 
@@ -0,0 +1,127 @@
+"""
+Club role resolver.
+
+A user's memberships are loaded once as a {club id: role} map and kept at two
+levels: on the user object for the rest of the request (the way Django's
+ModelBackend keeps _perm_cache), and in the shared cache across requests under
+a per-user version that membership writes replace. A warm check makes no
+queries. Roles are ranked (clubs.models.ROLE_RANKS): a check for a role
+passes for that role and every role above it.
+"""
+from functools import wraps
+from uuid import uuid4
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, FilteredRelation, Q
+from django.http import JsonResponse
+from clubs.models import Club, Membership, ROLE_RANKS
+
+# Seconds a user's role map stays in the shared cache
+ROLE_CACHE_TIMEOUT = 300
+
+
+def version_key(user_id):
+    return f"club-roles:version:{user_id}"
+
+
+def current_version(user_id):
+    '''
+    The version a user's role map is stored under. A fresh version is never
+    reused, so an evicted version key can't bring a stale map back.
+    '''
+    version = cache.get(version_key(user_id))
+    if version is None:
+        cache.add(version_key(user_id), uuid4().hex, None)
+        version = cache.get(version_key(user_id))
+    return version
+
+
+def club_roles(user):
+    ''' {club id: role} of every club user belongs to; empty for anonymous users '''
+    if not getattr(user, "is_authenticated", False):
+        return {}
+    if not hasattr(user, "_club_role_cache"):
+        key = f"club-roles:{user.pk}:{current_version(user.pk)}"
+        roles = cache.get(key)
+        if roles is None:
+            roles = dict(Membership.objects.filter(user_id=user.pk).values_list("club_id", "role"))
+            cache.set(key, roles, ROLE_CACHE_TIMEOUT)
+        user._club_role_cache = roles
+    return user._club_role_cache
+
+
+def roles_for(user, clubs):
+    ''' {club id: role, or None if not a member} for clubs (instances or ids) '''
+    roles = club_roles(user)
+    club_ids = [getattr(club, "pk", club) for club in clubs]
+    return {club_id: roles.get(club_id) for club_id in club_ids}
+
+
+def role_in(user, club):
+    ''' user's role in club (an instance or id), or None if not a member '''
+    return club_roles(user).get(getattr(club, "pk", club))
+
+
+def rank_at_least(role, min_role):
+    ''' Whether role (or None for no membership) ranks at or above min_role '''
+    return ROLE_RANKS.get(role, 0) >= ROLE_RANKS[min_role]
+
+
+def has_role(user, club, min_role="member"):
+    ''' Whether user holds at least min_role in club; an admin passes organizer checks '''
+    return rank_at_least(role_in(user, club), min_role)
+
+
+def club_with_role(user, club_id):
+    '''
+    (club, user's role in it or None), from one query joining the club to the
+    user's membership. Raises Club.DoesNotExist.
+    '''
+    club = (
+        Club.objects.annotate(membership=FilteredRelation("member_club", condition=Q(member_club__user_id=user.pk)))
+        .annotate(member_role=F("membership__role"))
+        .get(id=club_id)
+    )
+    return club, club.member_role
+
+
+def club_role_required(min_role="member", param="club_id", error=None):
+    '''
+    Decorator for views acting on the club named by the param request
+    argument. Resolves the club and the caller's role in one query, answers
+    400/404/403 itself, and hands the view request.club and request.club_role.
+    '''
+    article = "an" if min_role[0] in "aeiou" else "a"
+    error = error or f"you are not {article} {min_role} of this club"
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            club_id = (request.GET if request.method == "GET" else request.POST).get(param)
+            if not club_id:
+                return JsonResponse({"error": "missing required fields"}, status=400)
+            try:
+                club, role = club_with_role(request.user, club_id)
+            except Club.DoesNotExist:
+                return JsonResponse({"error": "club not found"}, status=404)
+            if not rank_at_least(role, min_role):
+                return JsonResponse({"error": error}, status=403)
+
+            request.club, request.club_role = club, role
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def invalidate_club_roles(user_ids):
+    '''
+    Move user_ids to new versions now and again after commit, so a request
+    that read the old memberships mid-transaction can't leave them cached.
+    '''
+    user_ids = list(user_ids)
+
+    def bump():
+        cache.set_many({version_key(user_id): uuid4().hex for user_id in user_ids}, None)
+
+    bump()
+    transaction.on_commit(bump)
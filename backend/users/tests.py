@@ -1,7 +1,11 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from users.models import User
-from clubs.models import Club, Membership
+from clubs.models import Club, Membership, MergeRequest
+from users.permissions import club_roles, club_with_role, roles_for
+from users.views import is_member
+from networking.models import ClubMembership, ClubNeighbor
+from django.db.models.deletion import Collector
 from io import BytesIO
 from PIL import Image
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -348,3 +352,104 @@ class UserPasswordTests(BaseTestCase):
             'password': 'newpassword'
         })
         self.assertIn(response.status_code, [302, 403])
+
+
+class ClubRoleCacheTests(BaseTestCase):
+    """Tests for the cached club role resolver"""
+
+    def setUp(self):
+        super().setUp()
+        self.clubs = [Club.objects.create(name=f'Club {i}', description='d') for i in range(3)]
+        Membership.objects.create(user=self.user1, club=self.clubs[0], role='member')
+        Membership.objects.create(user=self.user1, club=self.clubs[1], role='organizer')
+
+    def fresh_user(self):
+        return User.objects.get(id=self.user1.id)
+
+    def test_roles_for_many_clubs(self):
+        """Test roles_for resolves several clubs from one query"""
+        user = self.fresh_user()
+        with self.assertNumQueries(1):
+            roles = roles_for(user, self.clubs)
+            self.assertTrue(is_member(user, self.clubs[1], role='organizer'))
+
+        self.assertEqual(roles, {self.clubs[0].id: 'member', self.clubs[1].id: 'organizer', self.clubs[2].id: None})
+
+    def test_warm_checks_make_no_queries(self):
+        """Test a later request reads the roles from the shared cache"""
+        club_roles(self.fresh_user())
+        user = self.fresh_user()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(is_member(user, self.clubs[0]))
+
+    def test_membership_changes_invalidate(self):
+        """Test joining, role changes and leaving are seen by the next request"""
+        club_roles(self.fresh_user())
+
+        Membership.objects.create(user=self.user1, club=self.clubs[2], role='member')
+        self.assertTrue(is_member(self.fresh_user(), self.clubs[2]))
+
+        membership = Membership.objects.get(user=self.user1, club=self.clubs[0])
+        membership.role = 'organizer'
+        membership.save()
+        self.assertTrue(is_member(self.fresh_user(), self.clubs[0], role='organizer'))
+
+        Membership.objects.filter(user=self.user1, club=self.clubs[1]).delete()
+        self.assertFalse(is_member(self.fresh_user(), self.clubs[1]))
+
+    def test_proxy_changes_invalidate(self):
+        """Test memberships written through the networking proxy are seen too"""
+        club_roles(self.fresh_user())
+
+        ClubMembership.objects.create(user=self.user1, club=self.clubs[2])
+
+        self.assertTrue(is_member(self.fresh_user(), self.clubs[2]))
+
+    def test_other_models_stay_fast_deletable(self):
+        """Test the invalidation receivers only listen to memberships"""
+        collector = Collector(using='default')
+        self.assertTrue(collector.can_fast_delete(ClubNeighbor.objects.none()))
+        self.assertFalse(collector.can_fast_delete(Membership.objects.none()))
+
+
+class ClubRoleRankTests(BaseTestCase):
+    """Tests for ranked role checks and the club-scoped view decorator"""
+
+    def setUp(self):
+        super().setUp()
+        self.club = Club.objects.create(name='Club', description='d')
+        self.other = Club.objects.create(name='Other', description='d')
+        Membership.objects.create(user=self.user1, club=self.club, role='admin')
+        Membership.objects.create(user=self.user2, club=self.club, role='member')
+
+    def test_higher_roles_pass_lower_checks(self):
+        """Test an admin passes organizer checks and a member does not"""
+        self.assertTrue(is_member(self.user1, self.club, role='organizer'))
+        self.assertTrue(is_member(self.user1, self.club, role='member'))
+        self.assertFalse(is_member(self.user2, self.club, role='organizer'))
+
+        organizers = Membership.objects.filter(club=self.club).at_least('organizer')
+        self.assertEqual(list(organizers.values_list('user__username', flat=True)), ['testuser1'])
+
+    def test_club_with_role_is_one_query(self):
+        """Test the club and the caller's role come from one query"""
+        with self.assertNumQueries(1):
+            club, role = club_with_role(self.user1, self.club.id)
+        self.assertEqual((club, role), (self.club, 'admin'))
+        self.assertEqual(club_with_role(self.user1, self.other.id)[1], None)
+
+    def test_decorated_view(self):
+        """Test a club-scoped view admits an admin and answers 400/404/403 itself"""
+        merge_req = MergeRequest.objects.create(club_1=self.club, club_2=self.other)
+
+        self.client.force_login(self.user2)
+        response = self.client.post('/clubs/merge/delete/', {'club_id': self.club.id})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.post('/clubs/merge/delete/').status_code, 400)
+        self.assertEqual(self.client.post('/clubs/merge/delete/', {'club_id': 0}).status_code, 404)
+
+        self.client.force_login(self.user1)
+        response = self.client.post('/clubs/merge/delete/', {'club_id': self.club.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(MergeRequest.objects.filter(id=merge_req.id).exists())
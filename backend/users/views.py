@@ -5,18 +5,16 @@ from clubs.models import Club, Membership
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST, require_GET, require_http_methods
 from .models import User
+from .permissions import has_role
 from django.contrib.auth import login, logout, authenticate, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
 
 
 ''' INTERNAL LOGIC -- NOT CALLED BY URL '''
 def is_member(user: User, club: Club, role='default'):
-    ''' Check if user is a member of a club, with an optional role '''
+    ''' Check if user is a member of a club, with an optional minimum role (see users.permissions) '''
 
-    qs = Membership.objects.filter(user=user, club=club)
-    if role != "default":
-        qs = qs.filter(role=role)
-    return qs.exists()
+    return has_role(user, club, "member" if role == "default" else role)
 
 @require_POST
 @csrf_exempt